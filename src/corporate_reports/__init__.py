@@ -1,13 +1,27 @@
-from corporate_reports.edinet import (
-    EdinetAPIError,
-    check_api_key,
-    download_document,
-    search_documents,
-)
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from corporate_reports.edinet import (
+        EdinetAPIError,
+        check_api_key,
+        download_document,
+        download_many,
+        search_documents,
+    )
 
 __all__ = [
     "EdinetAPIError",
     "check_api_key",
     "download_document",
+    "download_many",
     "search_documents",
 ]
+
+
+def __getattr__(name: str):
+    # edinet は requests / dotenv を読み込むため、参照されたときに初めて import する
+    if name in __all__:
+        from corporate_reports import edinet
+
+        return getattr(edinet, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -8,11 +8,23 @@ from __future__ import annotations
 
 import json
 import re
+import string
 import sys
+import threading
+from collections.abc import Iterator
 from pathlib import Path
+from typing import Any
 
 import markdown
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, Comment
+
+# 正規表現はモジュールロード時に一度だけコンパイルする
+_NON_WORD_RE = re.compile(r"[^\w\s\u3000-\u9fff\uff00-\uffef]")
+_WHITESPACE_RE = re.compile(r"[\s\u3000]+")
+_HANY_RE = re.compile(r"^h[1-6]$")
+_META_RE = re.compile(r"^#\s+(.+?)（(\d{4})）", re.MULTILINE)
+_CHART_MARKER = "corporate-reports-chart:{}"
+_CHART_MARKER_RE = re.compile(r"<!--corporate-reports-chart:(\d+)-->")
 
 
 # ---------------------------------------------------------------------------
@@ -50,30 +62,54 @@ HTML_TEMPLATE = """\
 # ---------------------------------------------------------------------------
 
 
-def render_markdown_to_html(md_text: str) -> str:
-    """Markdown テキストを HTML に変換する。"""
+_md_local = threading.local()
+
+
+def _get_markdown() -> markdown.Markdown:
+    """Markdown インスタンスをスレッドごとに1つ生成して使い回す。
+
+    拡張の初期化はインスタンス生成時に走るため、複数レポートの一括ビルドで
+    毎回作り直すコストを避ける。呼び出し側は変換前に reset() すること。
+    """
+    md = getattr(_md_local, "md", None)
+    if md is None:
+        md = markdown.Markdown(
+            extensions=["tables", "toc"],
+            extension_configs={
+                "toc": {"slugify": _slugify},
+            },
+        )
+        _md_local.md = md
+    return md
+
+
+def render_markdown(md_text: str) -> tuple[str, list[dict]]:
+    """Markdown テキストを HTML に変換し、toc 拡張の見出しトークンと合わせて返す。"""
     # report.md 先頭のナビリンク行を除去（[← ...] で始まる行）
     lines = md_text.split("\n")
     if lines and lines[0].startswith("["):
         lines = lines[1:]
     md_text = "\n".join(lines)
 
-    html = markdown.markdown(
-        md_text,
-        extensions=["tables", "toc"],
-        extension_configs={
-            "toc": {"slugify": _slugify},
-        },
-    )
+    md = _get_markdown()
+    md.reset()
+    html = md.convert(md_text)
+    # toc_tokens は toc 拡張が実行時に追加する属性
+    return html, getattr(md, "toc_tokens", [])
+
+
+def render_markdown_to_html(md_text: str) -> str:
+    """Markdown テキストを HTML に変換する。"""
+    html, _ = render_markdown(md_text)
     return html
 
 
 def _slugify(value: str, separator: str = "-") -> str:
     """日本語見出しをスラグ化する。"""
     # 英数字・日本語はそのまま、記号はセパレータに
-    value = re.sub(r"[^\w\s\u3000-\u9fff\uff00-\uffef]", "", value)
+    value = _NON_WORD_RE.sub("", value)
     value = value.strip().lower()
-    value = re.sub(r"[\s\u3000]+", separator, value)
+    value = _WHITESPACE_RE.sub(separator, value)
     return value
 
 
@@ -82,10 +118,19 @@ def _slugify(value: str, separator: str = "-") -> str:
 # ---------------------------------------------------------------------------
 
 
-def build_toc(html_body: str) -> str:
-    """HTML body から h2/h3 見出しを抽出し、サイドバー用 <nav> HTML を生成する。"""
-    soup = BeautifulSoup(html_body, "html.parser")
-    headings = soup.find_all(re.compile(r"^h[23]$"))
+def _iter_toc_tokens(tokens: list[dict]):
+    """入れ子の toc トークンを文書順に平坦化して返す。"""
+    for token in tokens:
+        yield token
+        yield from _iter_toc_tokens(token.get("children", []))
+
+
+def build_toc(toc_tokens: list[dict]) -> str:
+    """toc 拡張の見出しトークンから h2/h3 を抽出し、サイドバー用 <nav> HTML を生成する。
+
+    HTML を再パースせず、Markdown 変換時に構築済みの見出しツリーをそのまま使う。
+    """
+    headings = [t for t in _iter_toc_tokens(toc_tokens) if t["level"] in (2, 3)]
     if not headings:
         return ""
 
@@ -94,11 +139,12 @@ def build_toc(html_body: str) -> str:
 
     for h in headings:
         slug = h.get("id", "")
-        text = h.get_text(strip=True)
+        # name は toc 拡張でエスケープ済みのテキスト
+        text = h.get("name", "")
         if not slug:
             continue
 
-        if h.name == "h2":
+        if h["level"] == 2:
             # 前の h2 グループを閉じる
             if in_h2_group:
                 items.append("</ul></li>")
@@ -137,12 +183,20 @@ def wrap_layout(toc_html: str, body_html: str) -> str:
 
 
 def inject_charts(html_body: str, charts: list[dict]) -> str:
-    """BeautifulSoup で HTML にチャート div をセクション直後に挿入する。"""
+    """BeautifulSoup (lxml) で HTML にチャート div をセクション直後に挿入する。"""
     if not charts:
         return html_body
 
-    soup = BeautifulSoup(html_body, "html.parser")
-    headings = soup.find_all(re.compile(r"^h[1-6]$"))
+    # lxml パーサは html.parser より高速。断片は <html><body> で包まれるため
+    # 挿入は body を基準に行う
+    soup = BeautifulSoup(html_body, "lxml")
+    root = soup.body or soup
+    headings = root.find_all(_HANY_RE)
+    exact_map, substring_index = _index_headings(headings)
+    sections = _index_sections(headings)
+    # 同じ見出しを参照するチャートが多いため、探索結果をセクション名でメモ化
+    targets: dict[str, Any] = {}
+    chart_htmls: list[str] = []
 
     for chart in charts:
         section = chart.get("section_heading", "")
@@ -152,7 +206,9 @@ def inject_charts(html_body: str, charts: list[dict]) -> str:
         note = chart.get("note", "")
         height = chart.get("height", 400)
 
-        target = _find_heading(headings, section)
+        if section not in targets:
+            targets[section] = _find_heading(exact_map, substring_index, section)
+        target = targets[section]
         if target is None:
             print(
                 f"WARNING: section_heading '{section}' not found, skipping chart '{chart_id}'",
@@ -160,69 +216,106 @@ def inject_charts(html_body: str, charts: list[dict]) -> str:
             )
             continue
 
-        chart_html = _build_chart_div(chart_id, title, note, height)
-        chart_tag = BeautifulSoup(chart_html, "html.parser")
-
-        if position == "before_section":
-            target.insert_before(chart_tag)
-        elif position == "after_section":
-            # 次の見出しの直前に挿入
-            next_heading = _find_next_heading(target)
-            if next_heading:
-                next_heading.insert_before(chart_tag)
-            else:
-                # 末尾に追加
-                soup.append(chart_tag)
-        else:
-            # after_table: セクション見出し後の最初のテーブル直後に挿入
-            table = _find_next_table(target)
-            if table:
-                table.insert_after(chart_tag)
-            else:
-                # テーブルがなければ見出し直後
-                _insert_after_element(target, chart_tag)
+        # チャート div 自体はパースせず、マーカーコメントを挿入して
+        # シリアライズ後に文字列で差し替える
+        chart_tag = Comment(_CHART_MARKER.format(len(chart_htmls)))
+        chart_htmls.append(_build_chart_div(chart_id, title, note, height))
+
+        insert = _POSITION_HANDLERS.get(position, _insert_after_table)
+        insert(root, target, *sections[id(target)], chart_tag)
 
-    return str(soup)
+    # 先頭のコメントや <style> 等は <head> や <html> の前へ移されるため、
+    # 包みタグを外して文書全体をシリアライズし、本文以外も落とさない
+    for wrapper in (soup.html, soup.head, soup.body):
+        if wrapper is not None:
+            wrapper.unwrap()
+    html = soup.decode()
+    return _CHART_MARKER_RE.sub(lambda m: chart_htmls[int(m.group(1))], html)
 
 
-def _find_heading(headings: list, text: str):
+def _index_headings(headings: list) -> tuple[dict[str, Any], list[tuple[str, Any]]]:
+    """見出しテキストを一度だけ取り出し、完全一致用 dict と部分一致用リストを作る。"""
+    exact_map: dict[str, Any] = {}
+    substring_index: list[tuple[str, Any]] = []
+    for h in headings:
+        text = h.get_text(strip=True)
+        # 同じテキストの見出しが複数あれば文書順で最初のものを優先
+        exact_map.setdefault(text, h)
+        substring_index.append((text, h))
+    return exact_map, substring_index
+
+
+def _find_heading(
+    exact_map: dict[str, Any], substring_index: list[tuple[str, Any]], text: str
+):
     """見出し要素から完全一致→部分一致で探索。"""
     # 完全一致
-    for h in headings:
-        if h.get_text(strip=True) == text:
-            return h
+    target = exact_map.get(text)
+    if target is not None:
+        return target
     # 部分一致
+    return next((h for t, h in substring_index if text in t), None)
+
+
+def _index_sections(headings: list) -> dict[int, tuple[Any, Any]]:
+    """見出しごとに (次の見出し, セクション内の最初の table) を事前計算する。
+
+    見出しの親要素ごとに子要素を一度だけ走査し、id(見出し) をキーに返す。
+    チャートごとに兄弟要素をたどり直す必要がなくなる。
+    """
+    index: dict[int, tuple[Any, Any]] = {}
+    seen_parents: set[int] = set()
     for h in headings:
-        if text in h.get_text(strip=True):
-            return h
-    return None
-
-
-def _find_next_heading(element):
-    """指定要素の後にある次の見出し要素を探す。"""
-    sibling = element.next_sibling
-    while sibling:
-        if (
-            hasattr(sibling, "name")
-            and sibling.name
-            and re.match(r"^h[1-6]$", sibling.name)
-        ):
-            return sibling
-        sibling = sibling.next_sibling
-    return None
-
-
-def _find_next_table(heading):
-    """見出し要素の後にある最初の table を探す。次の見出しが先に来たら None。"""
-    sibling = heading.next_sibling
-    while sibling:
-        if hasattr(sibling, "name") and sibling.name:
-            if re.match(r"^h[1-6]$", sibling.name):
-                return None
-            if sibling.name == "table":
-                return sibling
-        sibling = sibling.next_sibling
-    return None
+        parent = h.parent
+        if parent is None or id(parent) in seen_parents:
+            continue
+        seen_parents.add(id(parent))
+
+        current = None
+        table = None
+        for node in parent.children:
+            name = getattr(node, "name", None)
+            if not name:
+                continue
+            if _HANY_RE.match(name):
+                if current is not None:
+                    index[id(current)] = (node, table)
+                current = node
+                table = None
+            elif name == "table" and current is not None and table is None:
+                table = node
+        if current is not None:
+            index[id(current)] = (None, table)
+    return index
+
+
+def _insert_before_section(root, target, next_heading, table, chart_tag) -> None:
+    """before_section: セクション見出しの直前に挿入"""
+    target.insert_before(chart_tag)
+
+
+def _insert_after_section(root, target, next_heading, table, chart_tag) -> None:
+    """after_section: 次の見出しの直前に挿入。なければ末尾に追加"""
+    if next_heading is not None:
+        next_heading.insert_before(chart_tag)
+    else:
+        root.append(chart_tag)
+
+
+def _insert_after_table(root, target, next_heading, table, chart_tag) -> None:
+    """after_table: セクション見出し後の最初のテーブル直後に挿入。なければ見出し直後"""
+    if table is not None:
+        table.insert_after(chart_tag)
+    else:
+        _insert_after_element(target, chart_tag)
+
+
+# position → 挿入処理。未知の position は after_table として扱う
+_POSITION_HANDLERS = {
+    "before_section": _insert_before_section,
+    "after_section": _insert_after_section,
+    "after_table": _insert_after_table,
+}
 
 
 def _insert_after_element(element, new_tag):
@@ -252,37 +345,35 @@ def _build_chart_div(chart_id: str, title: str, note: str, height: int) -> str:
 # ---------------------------------------------------------------------------
 
 
+_ECHARTS_PROLOGUE = (
+    '<script src="https://cdn.jsdelivr.net/npm/echarts@5/dist/echarts.min.js"></script>\n'
+    "<script>\n"
+    "document.addEventListener('DOMContentLoaded', function() {\n"
+)
+_ECHARTS_EPILOGUE = "\n});\n</script>"
+
+
+def _build_chart_block(chart_id: str, option: dict) -> str:
+    """1チャート分の初期化 IIFE を生成する。オプションはコンパクトな JSON で埋め込む。"""
+    option_json = json.dumps(option, ensure_ascii=False, separators=(",", ":"))
+    return (
+        f"(function(){{var el=document.getElementById('{chart_id}');if(!el)return;"
+        f"var c=echarts.init(el);c.setOption({option_json});"
+        "window.addEventListener('resize',function(){c.resize();});})();"
+    )
+
+
 def build_echarts_script(charts: list[dict]) -> str:
     """全チャートの ECharts 初期化スクリプトを生成する。"""
     if not charts:
         return ""
 
-    lines = [
-        '<script src="https://cdn.jsdelivr.net/npm/echarts@5/dist/echarts.min.js"></script>',
-        "<script>",
-        "document.addEventListener('DOMContentLoaded', function() {",
+    chart_blocks = [
+        _build_chart_block(chart.get("id", "chart"), chart["echarts_option"])
+        for chart in charts
+        if chart.get("echarts_option")
     ]
-
-    for chart in charts:
-        chart_id = chart.get("id", "chart")
-        option = chart.get("echarts_option", {})
-        if not option:
-            continue
-        option_json = json.dumps(option, ensure_ascii=False, indent=2)
-        lines.append("  (function() {")
-        lines.append(f"    var el = document.getElementById('{chart_id}');")
-        lines.append("    if (!el) return;")
-        lines.append("    var chart = echarts.init(el);")
-        lines.append(f"    var option = {option_json};")
-        lines.append("    chart.setOption(option);")
-        lines.append(
-            "    window.addEventListener('resize', function() { chart.resize(); });"
-        )
-        lines.append("  })();")
-
-    lines.append("});")
-    lines.append("</script>")
-    return "\n".join(lines)
+    return _ECHARTS_PROLOGUE + "\n".join(chart_blocks) + _ECHARTS_EPILOGUE
 
 
 # ---------------------------------------------------------------------------
@@ -290,6 +381,35 @@ def build_echarts_script(charts: list[dict]) -> str:
 # ---------------------------------------------------------------------------
 
 
+# HTML_TEMPLATE を (固定部分, 差し込みフィールド名) の並びに分解しておく
+_TEMPLATE_PARTS: tuple[tuple[str, str | None], ...] = tuple(
+    (literal, field) for literal, field, _, _ in string.Formatter().parse(HTML_TEMPLATE)
+)
+
+
+def _iter_full_html(
+    layout: str,
+    chart_script: str,
+    company_name: str,
+    company_code: str,
+    css_path: str,
+    toc_script: str,
+) -> Iterator[str]:
+    """テンプレート片と差し込み値を出力順に返す。"""
+    fields = {
+        "css_path": css_path,
+        "layout": layout,
+        "chart_script": chart_script,
+        "toc_script": toc_script,
+        "company_name": company_name,
+        "company_code": company_code,
+    }
+    for literal, field in _TEMPLATE_PARTS:
+        yield literal
+        if field is not None:
+            yield fields[field]
+
+
 def render_full_html(
     layout: str,
     chart_script: str,
@@ -299,16 +419,34 @@ def render_full_html(
     toc_script: str = "",
 ) -> str:
     """最終 HTML を組み立てる。CSS は外部参照。"""
-    return HTML_TEMPLATE.format(
-        css_path=css_path,
-        layout=layout,
-        chart_script=chart_script,
-        toc_script=toc_script,
-        company_name=company_name,
-        company_code=company_code,
+    return "".join(
+        _iter_full_html(
+            layout, chart_script, company_name, company_code, css_path, toc_script
+        )
     )
 
 
+def write_full_html(
+    output_path: Path,
+    layout: str,
+    chart_script: str,
+    company_name: str,
+    company_code: str,
+    css_path: str = "../../assets/report.css",
+    toc_script: str = "",
+) -> None:
+    """最終 HTML をファイルへ直接書き出す。出力内容は render_full_html と同一。
+
+    全体を1つの文字列に組み立ててからエンコードせず、テンプレート片と
+    差し込み値を順にバイト列で書き込むことで、巨大な中間文字列を作らない。
+    """
+    parts = _iter_full_html(
+        layout, chart_script, company_name, company_code, css_path, toc_script
+    )
+    with open(output_path, "wb", buffering=1 << 20) as f:
+        f.writelines(part.encode("utf-8") for part in parts)
+
+
 # ---------------------------------------------------------------------------
 # report.md からメタ情報を抽出
 # ---------------------------------------------------------------------------
@@ -316,7 +454,7 @@ def render_full_html(
 
 def extract_meta(md_text: str) -> tuple[str, str]:
     """report.md の h1 から企業名と証券コードを抽出する。"""
-    m = re.search(r"^#\s+(.+?)（(\d{4})）", md_text, re.MULTILINE)
+    m = _META_RE.search(md_text)
     if m:
         return m.group(1), m.group(2)
     # フォールバック
@@ -337,19 +475,21 @@ def build_report(
     chart_config_path = report_dir / "chart_config.json"
     output_path = report_dir / "report.html"
 
-    if not md_path.exists():
-        raise FileNotFoundError(f"report.md not found: {md_path}")
-
-    md_text = md_path.read_text(encoding="utf-8")
+    # バイト列で一括読み込みしてから1回でデコードする（存在確認も兼ねる）
+    try:
+        md_text = md_path.read_bytes().decode("utf-8")
+    except FileNotFoundError:
+        raise FileNotFoundError(f"report.md not found: {md_path}") from None
     company_name, company_code = extract_meta(md_text)
 
-    # Markdown → HTML
-    html_body = render_markdown_to_html(md_text)
+    # Markdown → HTML（TOC 用の見出しトークンも同時に取得）
+    html_body, toc_tokens = render_markdown(md_text)
 
     # チャート処理
     charts: list[dict] = []
     if not no_charts and chart_config_path.exists():
-        config = json.loads(chart_config_path.read_text(encoding="utf-8"))
+        # json.loads はバイト列を直接受け付ける（テキスト層でのデコードを省く）
+        config = json.loads(chart_config_path.read_bytes())
         charts = config.get("charts", [])
         # config から企業情報を取得（あれば上書き）
         if config.get("company_name"):
@@ -364,7 +504,7 @@ def build_report(
     # TOC サイドバー生成 & レイアウトラップ
     toc_script = ""
     if not no_toc:
-        toc_html = build_toc(html_body)
+        toc_html = build_toc(toc_tokens)
         layout = wrap_layout(toc_html, html_body)
         toc_script = '<script src="../../assets/toc.js"></script>'
     else:
@@ -373,10 +513,13 @@ def build_report(
     # ECharts スクリプト生成
     chart_script = build_echarts_script(charts)
 
-    # 最終 HTML 組み立て
-    full_html = render_full_html(
-        layout, chart_script, company_name, company_code, toc_script=toc_script
+    # 最終 HTML 書き出し
+    write_full_html(
+        output_path,
+        layout,
+        chart_script,
+        company_name,
+        company_code,
+        toc_script=toc_script,
     )
-
-    output_path.write_text(full_html, encoding="utf-8")
     return output_path
@@ -6,13 +6,6 @@ import json
 import sys
 import argparse
 
-from corporate_reports.edinet import (
-    search_documents,
-    download_document,
-    extract_financial_data,
-    EdinetAPIError,
-)
-
 
 def main():
     parser = argparse.ArgumentParser(description="corporate-reports CLI")
@@ -41,6 +34,11 @@ def main():
     extract_parser.add_argument(
         "--output", help="出力先ファイルパス（省略時は標準出力）"
     )
+    extract_parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="抽出結果をCSVの隣にキャッシュし、次回以降再利用する",
+    )
 
     # edinet download
     download_parser = edinet_subparsers.add_parser(
@@ -119,60 +117,73 @@ def main():
             )
 
         elif args.command == "edinet":
-            if args.edinet_command == "search":
-                results = search_documents(
-                    date=args.date,
-                    sec_code=args.sec_code,
-                    ordinance_code=args.ordinance_code,
-                    form_code=args.form_code,
-                )
-                print(json.dumps(results, ensure_ascii=False, indent=2))
+            # edinet は requests / dotenv を読み込むため、使うときだけ import する
+            from corporate_reports.edinet import (
+                EdinetAPIError,
+                download_document,
+                extract_financial_data,
+                search_documents,
+            )
 
-            elif args.edinet_command == "extract":
-                data = extract_financial_data(csv_dir=args.csv_dir)
-                output_json = json.dumps(data, ensure_ascii=False, indent=2)
-                if args.output:
-                    from pathlib import Path
+            try:
+                if args.edinet_command == "search":
+                    results = search_documents(
+                        date=args.date,
+                        sec_code=args.sec_code,
+                        ordinance_code=args.ordinance_code,
+                        form_code=args.form_code,
+                    )
+                    print(json.dumps(results, ensure_ascii=False, indent=2))
 
-                    out = Path(args.output)
-                    out.parent.mkdir(parents=True, exist_ok=True)
-                    out.write_text(output_json + "\n", encoding="utf-8")
+                elif args.edinet_command == "extract":
+                    data = extract_financial_data(
+                        csv_dir=args.csv_dir, use_cache=args.cache
+                    )
+                    output_json = json.dumps(data, ensure_ascii=False, indent=2)
+                    if args.output:
+                        from pathlib import Path
+
+                        out = Path(args.output)
+                        out.parent.mkdir(parents=True, exist_ok=True)
+                        out.write_text(output_json + "\n", encoding="utf-8")
+                        print(
+                            json.dumps(
+                                {"status": "success", "file": str(out)},
+                                ensure_ascii=False,
+                            )
+                        )
+                    else:
+                        print(output_json)
+
+                elif args.edinet_command == "download":
+                    output_path = download_document(
+                        doc_id=args.doc_id,
+                        doc_type=args.type,
+                        output_path=args.output,
+                    )
                     print(
                         json.dumps(
-                            {"status": "success", "file": str(out)},
+                            {"status": "success", "file": output_path},
                             ensure_ascii=False,
                         )
                     )
-                else:
-                    print(output_json)
 
-            elif args.edinet_command == "download":
-                output_path = download_document(
-                    doc_id=args.doc_id,
-                    doc_type=args.type,
-                    output_path=args.output,
-                )
+                else:
+                    edinet_parser.print_help()
+                    sys.exit(1)
+            except EdinetAPIError as e:
                 print(
                     json.dumps(
-                        {"status": "success", "file": output_path},
-                        ensure_ascii=False,
-                    )
+                        {"status": "error", "message": str(e)}, ensure_ascii=False
+                    ),
+                    file=sys.stderr,
                 )
-
-            else:
-                edinet_parser.print_help()
                 sys.exit(1)
 
         else:
             parser.print_help()
             sys.exit(1)
 
-    except EdinetAPIError as e:
-        print(
-            json.dumps({"status": "error", "message": str(e)}, ensure_ascii=False),
-            file=sys.stderr,
-        )
-        sys.exit(1)
     except FileNotFoundError as e:
         print(
             json.dumps({"status": "error", "message": str(e)}, ensure_ascii=False),
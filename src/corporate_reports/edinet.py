@@ -4,22 +4,87 @@ EDINET API v2 クライアント
 書類検索・ダウンロード・CSV抽出を行うライブラリ。
 """
 
+import codecs
 import csv
+import functools
+import hashlib
+import io
+import json
 import os
+import re
+import shutil
+import sys
+import threading
 import time
+from collections.abc import Container, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional
 
 import requests
+import urllib3
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-# プロジェクトルートの .env を読み込み
+# プロジェクトルートの .env（APIキーが必要になった時点で読み込む）
 project_root = Path(__file__).parent.parent.parent
-load_dotenv(project_root / ".env")
 
+# インポート時点の環境変数のみを反映する。.env は読み込みを遅延しているため
+# ここには入らず、.env のキーは _get_api_key() が実行時に取得する
 API_KEY = os.getenv("EDINET_API_KEY")
 BASE_URL = "https://api.edinet-fsa.go.jp/api/v2"
 RATE_LIMIT_DELAY = 0.35  # 秒間3リクエスト = 約0.33秒間隔
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024  # ダウンロード時の読み込み単位（1MiB）
+DOWNLOAD_WORKERS = 3  # download_many の同時ダウンロード数
+
+
+def _create_session() -> requests.Session:
+    """EDINET 用の Session を生成する。
+
+    接続プールで TCP/TLS 接続を使い回し、429（レート制限）や 5xx は
+    バックオフ付きで自動リトライする。
+    """
+    session = requests.Session()
+    retry = Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+    )
+    session.mount(
+        "https://",
+        HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retry),
+    )
+    return session
+
+
+_SESSION = _create_session()
+
+
+class _RateLimiter:
+    """リクエスト間隔を interval 秒以上に保つスレッドセーフなレートリミッター。
+
+    次に送信してよい時刻をロック内で予約し、待機はロックの外で行う。
+    複数スレッドから呼ばれても送信時刻は interval 秒ずつずれる。
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._next_time = 0.0  # time.monotonic 基準
+
+    def acquire(self) -> None:
+        """送信枠が空くまで待つ"""
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_time)
+            self._next_time = start + self.interval
+        wait = start - now
+        if wait > 0:
+            time.sleep(wait)
+
+
+_RATE_LIMITER = _RateLimiter(RATE_LIMIT_DELAY)
 
 
 class EdinetAPIError(Exception):
@@ -28,15 +93,27 @@ class EdinetAPIError(Exception):
     pass
 
 
+@functools.cache
+def _load_env() -> None:
+    """プロジェクトルートの .env を一度だけ読み込む"""
+    load_dotenv(project_root / ".env")
+
+
 def _get_api_key() -> Optional[str]:
     """APIキーを取得（テスト時の環境変数変更に対応するため実行時に読む）"""
-    return API_KEY or os.getenv("EDINET_API_KEY")
+    if API_KEY:
+        return API_KEY
+    _load_env()
+    return os.getenv("EDINET_API_KEY")
 
 
+@functools.lru_cache(maxsize=1)
 def check_api_key() -> str:
-    """APIキーの存在確認。キーを返す。"""
-    import sys
+    """APIキーの存在確認。キーを返す。
 
+    取得できたキーはキャッシュする（未設定時は終了するためキャッシュされない）。
+    テストでキーを差し替える場合は check_api_key.cache_clear() を呼ぶこと。
+    """
     key = _get_api_key()
     if key:
         return key
@@ -53,6 +130,14 @@ def check_api_key() -> str:
     sys.exit(1)
 
 
+def _rate_limit() -> None:
+    """前回リクエストから RATE_LIMIT_DELAY 経過するまで待つ。
+
+    リクエスト後に毎回固定で待つのではなく、次のリクエスト直前に不足分だけ待つ。
+    """
+    _RATE_LIMITER.acquire()
+
+
 def search_documents(
     date: str,
     sec_code: Optional[str] = None,
@@ -81,7 +166,8 @@ def search_documents(
     }
 
     try:
-        response = requests.get(url, params=params, timeout=30)
+        _rate_limit()
+        response = _SESSION.get(url, params=params, timeout=30)
         response.raise_for_status()
         data = response.json()
 
@@ -90,23 +176,21 @@ def search_documents(
 
         results = data.get("results", [])
 
-        # フィルタリング
-        if sec_code:
-            # 4桁コードの場合は前方一致（EDINETは5桁で末尾0付き）
-            sec_prefix = sec_code[:4]
+        # フィルタリング（全条件を1パスで評価）
+        # 4桁コードの場合は前方一致（EDINETは5桁で末尾0付き）
+        sec_prefix = sec_code[:4] if sec_code else None
+        if sec_prefix or ordinance_code or form_code:
             results = [
                 r
                 for r in results
-                if r.get("secCode") and r.get("secCode")[:4] == sec_prefix
+                if (
+                    sec_prefix is None
+                    or ((sc := r.get("secCode")) and sc[:4] == sec_prefix)
+                )
+                and (not ordinance_code or r.get("ordinanceCode") == ordinance_code)
+                and (not form_code or r.get("formCode") == form_code)
             ]
 
-        if ordinance_code:
-            results = [r for r in results if r.get("ordinanceCode") == ordinance_code]
-
-        if form_code:
-            results = [r for r in results if r.get("formCode") == form_code]
-
-        time.sleep(RATE_LIMIT_DELAY)
         return results
 
     except requests.exceptions.RequestException as e:
@@ -138,24 +222,62 @@ def download_document(doc_id: str, doc_type: str, output_path: str) -> str:
     }
 
     try:
-        response = requests.get(url, params=params, timeout=60, stream=True)
-        response.raise_for_status()
+        _rate_limit()
+        with _SESSION.get(url, params=params, timeout=60, stream=True) as response:
+            response.raise_for_status()
+
+            # ファイルに保存
+            output_file = Path(output_path)
+            output_file.parent.mkdir(parents=True, exist_ok=True)
+
+            # 8KB 単位の iter_content ではなく、生ストリームを 1MiB 単位で直接コピー
+            # （Content-Encoding の展開は urllib3 側に任せる）
+            response.raw.decode_content = True
+            try:
+                with open(output_file, "wb") as f:
+                    shutil.copyfileobj(response.raw, f, length=DOWNLOAD_CHUNK_SIZE)
+            except urllib3.exceptions.HTTPError as e:
+                # 生ストリームの読み込み失敗は requests の例外に包まれないため、
+                # 途中まで書いたファイルを消してから変換する
+                output_file.unlink(missing_ok=True)
+                raise EdinetAPIError(f"Download failed: {e}")
 
-        # ファイルに保存
-        output_file = Path(output_path)
-        output_file.parent.mkdir(parents=True, exist_ok=True)
-
-        with open(output_file, "wb") as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
-
-        time.sleep(RATE_LIMIT_DELAY)
         return str(output_file)
 
     except requests.exceptions.RequestException as e:
         raise EdinetAPIError(f"Download failed: {e}")
 
 
+def download_many(
+    tasks: Iterable[tuple[str, str, str]], max_workers: int = DOWNLOAD_WORKERS
+) -> list[str]:
+    """
+    複数の書類を並行してダウンロード
+
+    送信間隔は共有のレートリミッターで制御するため、並行数を増やしても
+    API のレート制限（秒間3リクエスト）は超えない。
+
+    各スレッドはモジュール共通の _SESSION を共有する。生成後に headers や
+    アダプタ等の設定を変更せず（APIキーもリクエストごとの params で渡す）、
+    接続の貸し借りはスレッドセーフな urllib3 の接続プール（pool_maxsize=8 は
+    既定の同時数以上）が担い、Cookie の更新も CookieJar 内部のロックで
+    保護されるため、GET を並行して発行する用途では共有しても安全。
+
+    Args:
+        tasks: (doc_id, doc_type, output_path) のイテラブル
+        max_workers: 同時ダウンロード数
+
+    Returns:
+        保存先のパスのリスト（tasks と同じ順序）
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(download_document, doc_id, doc_type, output_path)
+            for doc_id, doc_type, output_path in tasks
+        ]
+        return [future.result() for future in futures]
+
+
 # --- CSV 抽出 ---
 
 # 経営指標等 (SummaryOfBusinessResults) で抽出する要素IDと出力キー名のマッピング
@@ -194,6 +316,33 @@ _CONTEXT_YEAR_MAP: dict[str, str] = {
 }
 
 
+# コンテキストIDの年度部分と、個別（NonConsolidatedMember）かを同時に取り出す。
+# セグメント等の次元付きコンテキスト（..._XxxSegmentMember 等）は一致させない
+_CONTEXT_RE = re.compile(
+    "("
+    + "|".join(map(re.escape, _CONTEXT_YEAR_MAP))
+    + ")(?:Duration|Instant)(_NonConsolidatedMember)?"
+)
+
+# 要素ID → (出力キー名, 個別コンテキストから取るか) の統合ルックアップ
+_ELEMENT_LOOKUP: dict[str, tuple[str, bool]] = {
+    **{eid: (key, False) for eid, key in _SUMMARY_ELEMENTS.items()},
+    **{eid: (key, True) for eid, key in _NON_CONSOLIDATED_ELEMENTS.items()},
+}
+
+# 抽出結果キャッシュの保存形式のバージョン（形式の変更時に上げる）
+# 抽出定義（要素・コンテキスト）はキャッシュキーに直接含めるため、ここでは扱わない
+_EXTRACT_CACHE_VERSION = "1"
+
+# 抽出処理で参照する列
+_CSV_COLUMNS: list[str] = ["要素ID", "コンテキストID", "値"]
+
+
+# セル前後から除去する文字（空白・全角空白・ダブルクォート）
+# translate で全削除すると値の途中のクォートまで消えるため、前後のみを1回の strip で落とす
+_CELL_STRIP_CHARS = ' \t\r\n\v\f\u3000"'
+
+
 def _parse_value(value: str) -> int | float | str | None:
     """値文字列を適切な型に変換"""
     if not value or value == "－":
@@ -206,30 +355,156 @@ def _parse_value(value: str) -> int | float | str | None:
         return value
 
 
-def _parse_edinet_csv(csv_path: str | Path) -> list[dict[str, str]]:
-    """EDINET CSV（UTF-16LE TSV）を読み込んでレコードのリストを返す"""
-    rows = []
-    with open(csv_path, encoding="utf-16le", newline="") as f:
-        reader = csv.reader(f, delimiter="\t")
-        header = next(reader)
-        # BOM・ダブルクォート除去（BOMとクォートが交互に入る場合も考慮）
-        header = [h.strip().strip("\ufeff").strip('"').strip("\ufeff") for h in header]
-        for row in reader:
-            if len(row) < len(header):
-                continue
-            record = {}
-            for i, col in enumerate(header):
-                record[col] = row[i].strip().strip('"')
-            rows.append(record)
-    return rows
-
-
-def extract_financial_data(csv_dir: str | Path) -> dict:
+def _iter_edinet_csv(
+    data: bytes,
+    columns: list[str] | None = None,
+    element_ids: Container[str] | None = None,
+) -> Iterator[dict[str, str]]:
+    """
+    EDINET CSV（UTF-16LE TSV）のバイト列からレコードを1行ずつ返す
+
+    デコードとトークン化は読み進めた分だけ行うため、途中で打ち切れば
+    残りの行は処理しない。
+
+    Args:
+        data: CSVファイルの内容
+        columns: 取り出す列名のリスト（省略時は全列。ヘッダーに無い列は無視）
+        element_ids: 指定時は要素IDがこれに含まれる行のみ返す
+    """
+    # メモリ上のバイト列をチャンク単位で逐次デコードする
+    # 先頭の BOM は読み飛ばし、1列目のクォートを csv に解釈させる
+    stream = io.BytesIO(data)
+    if data.startswith(codecs.BOM_UTF16_LE):
+        stream.seek(len(codecs.BOM_UTF16_LE))
+    text = io.TextIOWrapper(stream, encoding="utf-16le", newline="")
+    reader = csv.reader(text, delimiter="\t")
+    header = next(reader, None)
+    if header is None:
+        return
+    # クォート内側に BOM が入っている場合の除去
+    header = [h.strip().strip('"').lstrip("\ufeff") for h in header]
+    n_cols = len(header)
+
+    # 必要な列だけを辞書に詰める（列の射影）
+    if columns is None:
+        selected = list(enumerate(header))
+    else:
+        wanted = set(columns)
+        selected = [(i, col) for i, col in enumerate(header) if col in wanted]
+
+    rows = (row for row in reader if len(row) >= n_cols)
+    # 読み込み時点で対象外の要素を落とし、不要な行の辞書を作らない
+    if element_ids is not None and "要素ID" in header:
+        elem_idx = header.index("要素ID")
+        rows = (
+            row for row in rows if row[elem_idx].strip(_CELL_STRIP_CHARS) in element_ids
+        )
+
+    for row in rows:
+        yield {col: row[i].strip(_CELL_STRIP_CHARS) for i, col in selected}
+
+
+def _parse_edinet_csv(
+    csv_path: str | Path,
+    columns: list[str] | None = None,
+    element_ids: Container[str] | None = None,
+) -> list[dict[str, str]]:
+    """
+    EDINET CSV（UTF-16LE TSV）を読み込んでレコードのリストを返す
+
+    Args:
+        csv_path: CSVファイルのパス
+        columns: 取り出す列名のリスト（省略時は全列。ヘッダーに無い列は無視）
+        element_ids: 指定時は要素IDがこれに含まれる行のみ返す
+    """
+    data = Path(csv_path).read_bytes()
+    return list(_iter_edinet_csv(data, columns=columns, element_ids=element_ids))
+
+
+def _extract_summary(data: bytes) -> dict[str, dict]:
+    """CSVの内容から経営指標等（5期分）を年度ごとのdictで返す"""
+    # 全セルが埋まった時点で打ち切れるよう、行は遅延して読む
+    rows = _iter_edinet_csv(data, columns=_CSV_COLUMNS, element_ids=_ELEMENT_LOOKUP)
+
+    # (年度, 項目) をキーにした1段の辞書に集め、最後に年度ごとへ組み替える
+    cells: dict[tuple[str, str], int | float | str | None] = {}
+    n_cells = len(_ELEMENT_LOOKUP) * len(_CONTEXT_YEAR_MAP)
+
+    for row in rows:
+        hit = _ELEMENT_LOOKUP.get(row.get("要素ID", ""))
+        if hit is None:
+            continue
+        key, needs_non_consolidated = hit
+
+        # 年度と連結/個別を1回の正規表現マッチで判定する
+        # （連結の指標は連結コンテキスト、個別の指標は NonConsolidated コンテキストのみ）
+        m = _CONTEXT_RE.fullmatch(row.get("コンテキストID", ""))
+        if m is None or (m.group(2) is not None) != needs_non_consolidated:
+            continue
+
+        # 同じ年度・項目は最初に出現した値を採用し、全セルが埋まったら打ち切る
+        cell = (_CONTEXT_YEAR_MAP[m.group(1)], key)
+        if cell in cells:
+            continue
+        cells[cell] = _parse_value(row.get("値", ""))
+        if len(cells) == n_cells:
+            break
+
+    # 経営指標等（5期分）
+    summary: dict[str, dict] = {
+        year_label: {} for year_label in _CONTEXT_YEAR_MAP.values()
+    }
+    for (year_label, key), value in cells.items():
+        summary[year_label][key] = value
+
+    return summary
+
+
+def _extract_cache_path(csv_path: Path, data: bytes) -> Path:
+    """CSVの内容と抽出定義のハッシュをファイル名に含むキャッシュパスを返す
+
+    CSVの内容か抽出定義が変わればパスが変わり、古いキャッシュは使われない。
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(_EXTRACT_CACHE_VERSION.encode())
+    digest.update(repr(_ELEMENT_LOOKUP).encode())
+    digest.update(repr(_CONTEXT_YEAR_MAP).encode())
+    digest.update(_CONTEXT_RE.pattern.encode())
+    digest.update(data)
+    return csv_path.with_suffix(f".{digest.hexdigest()}.extracted.json")
+
+
+def _read_extract_cache(cache_path: Path) -> dict[str, dict] | None:
+    """キャッシュを読み込む。無い・壊れている場合は None"""
+    try:
+        return json.loads(cache_path.read_bytes())
+    except (OSError, ValueError):
+        return None
+
+
+def _write_extract_cache(
+    csv_path: Path, cache_path: Path, summary: dict[str, dict]
+) -> None:
+    """キャッシュを書き込み、同じCSVの古いキャッシュを削除する
+
+    書き込めない場所でも抽出自体は続ける。
+    """
+    try:
+        cache_path.write_text(json.dumps(summary, ensure_ascii=False), encoding="utf-8")
+        for stale in csv_path.parent.glob(f"{csv_path.stem}.*.extracted.json"):
+            if stale != cache_path:
+                stale.unlink(missing_ok=True)
+    except OSError:
+        pass
+
+
+def extract_financial_data(csv_dir: str | Path, use_cache: bool = False) -> dict:
     """
     EDINET CSVディレクトリから主要財務データを抽出
 
     Args:
         csv_dir: CSVディレクトリのパス（XBRL_TO_CSV/ を含む親ディレクトリ）
+        use_cache: CSVの隣に抽出結果キャッシュ（*.extracted.json）を保存・再利用するか
 
     Returns:
         構造化された財務データのdict
@@ -250,37 +525,18 @@ def extract_financial_data(csv_dir: str | Path) -> dict:
         raise EdinetAPIError(f"jpcrp030000-asr-*.csv が見つかりません: {csv_dir}")
 
     csv_path = csv_files[0]
-    rows = _parse_edinet_csv(csv_path)
 
-    # 経営指標等（5期分）
-    summary: dict[str, dict] = {}
-    for year_label in _CONTEXT_YEAR_MAP.values():
-        summary[year_label] = {}
-
-    for row in rows:
-        elem_id = row.get("要素ID", "")
-        context_id = row.get("コンテキストID", "")
-        value = row.get("値", "")
-
-        # 連結の経営指標等
-        if elem_id in _SUMMARY_ELEMENTS:
-            for ctx_prefix, year_label in _CONTEXT_YEAR_MAP.items():
-                if (
-                    context_id.startswith(ctx_prefix)
-                    and "NonConsolidated" not in context_id
-                ):
-                    key = _SUMMARY_ELEMENTS[elem_id]
-                    summary[year_label][key] = _parse_value(value)
-
-        # 個別（NonConsolidatedMember）の指標
-        if elem_id in _NON_CONSOLIDATED_ELEMENTS:
-            for ctx_prefix, year_label in _CONTEXT_YEAR_MAP.items():
-                if (
-                    context_id.startswith(ctx_prefix)
-                    and "NonConsolidated" in context_id
-                ):
-                    key = _NON_CONSOLIDATED_ELEMENTS[elem_id]
-                    summary[year_label][key] = _parse_value(value)
+    # ハッシュ計算と抽出で同じバイト列を使い、CSVの読み込みは1回にする
+    data = csv_path.read_bytes()
+    if use_cache:
+        # 同じ内容のCSVは前回の抽出結果を再利用する
+        cache_path = _extract_cache_path(csv_path, data)
+        summary = _read_extract_cache(cache_path)
+        if summary is None:
+            summary = _extract_summary(data)
+            _write_extract_cache(csv_path, cache_path, summary)
+    else:
+        summary = _extract_summary(data)
 
     result = {
         "source": str(csv_path),
@@ -16,7 +16,14 @@ class ValuationError(Exception):
     """バリュエーション計算エラー"""
 
 
-@dataclass(frozen=True)
+def _normalize_millions(val: float) -> float:
+    """大きすぎる値は千円単位とみなして百万円に変換"""
+    if abs(val) > 1_000_000:
+        return val / 1000
+    return val
+
+
+@dataclass(frozen=True, slots=True)
 class ValuationInput:
     """バリュエーション計算の入力データ（内部統一単位）
 
@@ -66,12 +73,6 @@ class ValuationInput:
         else:
             shares = shares_raw
 
-        # 大きすぎる値は千円→百万円変換
-        def normalize_millions(val: float) -> float:
-            if abs(val) > 1_000_000:
-                return val / 1000
-            return val
-
         return cls(
             stock_price=data["stock_price"],
             shares=shares,
@@ -82,11 +83,11 @@ class ValuationInput:
             revenue=data["revenue"],
             operating_profit=data["operating_profit"],
             net_income=data["net_income"],
-            operating_cf=normalize_millions(data["operating_cf"]),
-            fcf=normalize_millions(data["fcf"]),
-            net_cash=normalize_millions(data["net_cash"]),
-            ebitda=normalize_millions(data["ebitda"]),
-            net_assets=normalize_millions(data["net_assets"]),
+            operating_cf=_normalize_millions(data["operating_cf"]),
+            fcf=_normalize_millions(data["fcf"]),
+            net_cash=_normalize_millions(data["net_cash"]),
+            ebitda=_normalize_millions(data["ebitda"]),
+            net_assets=_normalize_millions(data["net_assets"]),
             effective_tax_rate=data.get("effective_tax_rate", 0.30),
             discount_rate=data.get("discount_rate", 0.10),
             liquidation_value_per_share=data.get("liquidation_value_per_share"),
@@ -96,7 +97,7 @@ class ValuationInput:
         )
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class DCFResult:
     """DCF1シナリオの結果"""
 
@@ -200,38 +201,76 @@ def _calc_dcf_scenario(
     弱気(growth=0): TV = FCF / r のみ（成長なし永続価値）
     ミドル/強気: 成長期間のFCFを割引 + ターミナルバリュー
     """
+    return _calc_dcf_scenarios(
+        fcf=fcf,
+        scenarios=[(label, growth_rate)],
+        discount_rate=discount_rate,
+        years=years,
+        net_cash=net_cash,
+        shares=shares,
+        price=price,
+    )[0]
+
+
+def _calc_dcf_scenarios(
+    fcf: float,
+    scenarios: list[tuple[str, float]],
+    discount_rate: float,
+    years: int,
+    net_cash: float,
+    shares: float,
+    price: float,
+) -> list[DCFResult]:
+    """成長率だけが異なる複数シナリオのDCFをまとめて計算する
+
+    割引率・年数・株数などシナリオ間で共通の値は一度だけ計算する。
+
+    Args:
+        scenarios: (ラベル, 成長率) のリスト
+    """
     if discount_rate == 0:
         raise ValuationError("割引率が0です")
 
-    if growth_rate == 0:
-        # 成長なし: 永続価値のみ
-        terminal_value = fcf / discount_rate
-        equity_value = terminal_value + net_cash
-    else:
-        # 成長期間のFCF割引現在価値
-        pv_fcfs = 0.0
-        projected_fcf = fcf
-        for year in range(1, years + 1):
-            projected_fcf = projected_fcf * (1 + growth_rate)
-            pv_fcfs += projected_fcf / (1 + discount_rate) ** year
-
-        # ターミナルバリュー（成長期間後のFCFを永続価値化して割引）
-        terminal_value = projected_fcf / discount_rate
-        pv_terminal = terminal_value / (1 + discount_rate) ** years
-
-        equity_value = pv_fcfs + pv_terminal + net_cash
-
-    per_share = equity_value * 1_000_000 / shares  # 百万円→円
-    upside = (per_share - price) / price
-
-    return DCFResult(
-        label=label,
-        growth_rate=growth_rate,
-        terminal_value=terminal_value,
-        equity_value=equity_value,
-        per_share=round(per_share, 0),
-        upside=round(upside, 4),
-    )
+    discount_step = 1 + discount_rate
+
+    results = []
+    for label, growth_rate in scenarios:
+        if growth_rate == 0:
+            # 成長なし: 永続価値のみ
+            terminal_value = fcf / discount_rate
+            equity_value = terminal_value + net_cash
+        else:
+            # 成長期間のFCF割引現在価値
+            # Σ_{t=1..N} FCF·q^t（q = (1+g)/(1+r)）の等比級数を閉じた式で計算する
+            growth_factor = 1 + growth_rate
+            q_n = (growth_factor / discount_step) ** years
+            if growth_rate == discount_rate:
+                pv_fcfs = fcf * years
+            else:
+                pv_fcfs = (
+                    fcf * growth_factor * (1 - q_n) / (discount_rate - growth_rate)
+                )
+
+            # ターミナルバリュー（成長期間後のFCFを永続価値化して割引）
+            terminal_value = fcf * growth_factor**years / discount_rate
+            pv_terminal = fcf * q_n / discount_rate
+
+            equity_value = pv_fcfs + pv_terminal + net_cash
+
+        per_share = equity_value * 1_000_000 / shares  # 百万円→円
+        upside = (per_share - price) / price
+
+        results.append(
+            DCFResult(
+                label=label,
+                growth_rate=growth_rate,
+                terminal_value=terminal_value,
+                equity_value=equity_value,
+                per_share=round(per_share, 0),
+                upside=round(upside, 4),
+            )
+        )
+    return results
 
 
 # --- 統合関数 ---
@@ -261,36 +300,19 @@ def calculate_valuation(inp: ValuationInput) -> dict[str, Any]:
     if per_forecast is not None:
         per_pbr = per_forecast * pbr
 
-    # DCF 3シナリオ
-    dcf_bear = _calc_dcf_scenario(
-        fcf=inp.fcf,
-        growth_rate=0,
-        discount_rate=inp.discount_rate,
-        years=inp.dcf_years,
-        net_cash=inp.net_cash,
-        shares=inp.shares,
-        price=inp.stock_price,
-        label="弱気",
-    )
-    dcf_middle = _calc_dcf_scenario(
+    # DCF 3シナリオ（成長率のみ異なる）
+    dcf_scenarios = _calc_dcf_scenarios(
         fcf=inp.fcf,
-        growth_rate=inp.dcf_growth_middle,
-        discount_rate=inp.discount_rate,
-        years=inp.dcf_years,
-        net_cash=inp.net_cash,
-        shares=inp.shares,
-        price=inp.stock_price,
-        label="ミドル",
-    )
-    dcf_strong = _calc_dcf_scenario(
-        fcf=inp.fcf,
-        growth_rate=inp.dcf_growth_strong,
+        scenarios=[
+            ("弱気", 0),
+            ("ミドル", inp.dcf_growth_middle),
+            ("強気", inp.dcf_growth_strong),
+        ],
         discount_rate=inp.discount_rate,
         years=inp.dcf_years,
         net_cash=inp.net_cash,
         shares=inp.shares,
         price=inp.stock_price,
-        label="強気",
     )
 
     def _round(val: float | None, digits: int = 2) -> float | None:
@@ -323,7 +345,7 @@ def calculate_valuation(inp: ValuationInput) -> dict[str, Any]:
                 "per_share": d.per_share,
                 "upside": d.upside,
             }
-            for d in [dcf_bear, dcf_middle, dcf_strong]
+            for d in dcf_scenarios
         ],
     }
 
@@ -334,8 +356,9 @@ def calculate_valuation(inp: ValuationInput) -> dict[str, Any]:
 def load_input(path: Path) -> ValuationInput:
     """JSONファイルからValuationInputを読み込む"""
     try:
-        data = json.loads(path.read_text(encoding="utf-8"))
-    except (json.JSONDecodeError, OSError) as e:
+        # バイト列のまま json に渡す（UTF-8 のデコードはパーサー側で行う）
+        data = json.loads(path.read_bytes())
+    except (json.JSONDecodeError, UnicodeDecodeError, OSError) as e:
         raise ValuationError(f"入力ファイルの読み込みに失敗: {e}") from e
     return ValuationInput.from_dict(data)
 
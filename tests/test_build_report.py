@@ -9,6 +9,7 @@ from corporate_reports.build_report import (
     build_report,
     extract_meta,
     inject_charts,
+    render_markdown,
     render_markdown_to_html,
 )
 
@@ -44,6 +45,14 @@ class TestRenderMarkdown:
         assert "<h2" in html
         assert "<h3" in html
 
+    def test_repeated_render_is_independent(self):
+        # 変換器を使い回しても前回の見出し・スラグが残らない
+        html1, tokens1 = render_markdown("## 概要\n")
+        html2, tokens2 = render_markdown("## 概要\n")
+        assert html1 == html2
+        assert 'id="概要"' in html2
+        assert [t["id"] for t in tokens1] == [t["id"] for t in tokens2] == ["概要"]
+
 
 # ---------------------------------------------------------------------------
 # extract_meta
@@ -139,6 +148,80 @@ class TestInjectCharts:
         next_heading_pos = result.find("財務ハイライト")
         assert chart_pos < next_heading_pos
 
+    def test_chart_div_inserted_verbatim(self):
+        from corporate_reports.build_report import _build_chart_div
+
+        html = self._make_html()
+        charts = [
+            {
+                "id": "chart-v",
+                "section_heading": "セグメント構成",
+                "position": "after_table",
+                "title": "売上 & 利益",
+                "note": "注記",
+                "height": 300,
+            }
+        ]
+        result = inject_charts(html, charts)
+        assert _build_chart_div("chart-v", "売上 & 利益", "注記", 300) in result
+        assert "<!--" not in result
+
+    def test_no_document_wrapper(self):
+        # lxml が補う <html><body> は出力に含めない
+        html = self._make_html()
+        charts = [{"id": "chart-w", "section_heading": "財務ハイライト"}]
+        result = inject_charts(html, charts)
+        assert result.startswith("<h2>セグメント構成</h2>")
+        assert "<html" not in result
+        assert "<body" not in result
+
+    def test_keeps_leading_comment(self):
+        # lxml が <html> の前へ移す先頭コメントも出力に残す
+        html = "<!-- memo -->\n<h2>A</h2>\n<p>x</p>"
+        result = inject_charts(html, [{"id": "chart-c", "section_heading": "A"}])
+        assert result.startswith("<!-- memo -->")
+        assert result.find("<h2>A</h2>") < result.find("chart-c")
+        assert "<html" not in result
+
+    def test_keeps_leading_style(self):
+        # lxml が <head> へ移す先頭の <style> も出力に残す
+        html = "<style>.x{color:red}</style>\n<h2>A</h2>\n<p>x</p>"
+        result = inject_charts(html, [{"id": "chart-s", "section_heading": "A"}])
+        assert result.startswith("<style>.x{color:red}</style>")
+        assert result.find("<h2>A</h2>") < result.find("chart-s")
+        assert "<head" not in result
+
+    def test_after_section_last_heading_appends(self):
+        # 後続見出しがなければ body 末尾に追加される
+        html = self._make_html()
+        charts = [
+            {
+                "id": "chart-end",
+                "section_heading": "財務ハイライト",
+                "position": "after_section",
+            }
+        ]
+        result = inject_charts(html, charts)
+        assert result.rstrip().endswith("</div>")
+        assert result.find("<p>テキスト</p>") < result.find("chart-end")
+        assert "</body>" not in result
+
+    def test_after_table_stops_at_next_heading(self):
+        # 次の見出しより後ろのテーブルは対象にしない（見出し直後に挿入）
+        html = "<h2>A</h2>\n<p>x</p>\n<h2>B</h2>\n<table><tr><td>1</td></tr></table>"
+        result = inject_charts(html, [{"id": "chart-h", "section_heading": "A"}])
+        assert result.find("chart-h") < result.find("<h2>B</h2>")
+
+    def test_nested_heading_uses_own_siblings(self):
+        html = (
+            "<div><h3>内側</h3><table><tr><td>1</td></tr></table></div>\n"
+            "<h2>外側</h2>\n<table><tr><td>2</td></tr></table>"
+        )
+        charts = [{"id": "chart-in", "section_heading": "内側"}]
+        result = inject_charts(html, charts)
+        chart_pos = result.find("chart-in")
+        assert result.find("<td>1</td>") < chart_pos < result.find("<h2>外側</h2>")
+
     def test_partial_match(self):
         html = "<h2>連結経営指標の推移</h2>\n<table><tr><td>x</td></tr></table>"
         charts = [
@@ -154,6 +237,24 @@ class TestInjectCharts:
         result = inject_charts(html, charts)
         assert 'id="chart-partial"' in result
 
+    def test_exact_match_preferred(self):
+        # 部分一致する見出しが先にあっても完全一致を優先する
+        html = (
+            "<h2>連結経営指標の推移</h2>\n<p>a</p>\n<h2>経営指標の推移</h2>\n<p>b</p>"
+        )
+        charts = [
+            {
+                "id": f"chart-{i}",
+                "section_heading": "経営指標の推移",
+                "position": "before_section",
+            }
+            for i in range(2)
+        ]
+        result = inject_charts(html, charts)
+        exact_pos = result.find("<h2>経営指標の推移</h2>")
+        assert result.find("<p>a</p>") < result.find("chart-0") < exact_pos
+        assert result.find("<p>a</p>") < result.find("chart-1") < exact_pos
+
     def test_no_match_skipped(self, capsys):
         html = "<h2>存在する見出し</h2>"
         charts = [
@@ -198,6 +299,8 @@ class TestBuildEchartsScript:
         assert "echarts.min.js" in script
         assert "echarts.init" in script
         assert "chart-test" in script
+        # オプションはインデントなしのコンパクト JSON で埋め込まれる
+        assert '{"type":"category","data":["A","B"]}' in script
 
     def test_empty_charts(self):
         assert build_echarts_script([]) == ""
@@ -288,6 +391,27 @@ class TestBuildReport:
         assert "report-content" in html
         assert "toc.js" in html
 
+    def test_written_html_matches_render(self, tmp_path):
+        from corporate_reports.build_report import (
+            HTML_TEMPLATE,
+            render_full_html,
+            write_full_html,
+        )
+
+        args = ("<p>本文 {x}</p>", "<script></script>", "テスト企業", "1234")
+        out = tmp_path / "report.html"
+        write_full_html(out, *args, toc_script="<script>toc</script>")
+        expected = HTML_TEMPLATE.format(
+            css_path="../../assets/report.css",
+            layout=args[0],
+            chart_script=args[1],
+            toc_script="<script>toc</script>",
+            company_name=args[2],
+            company_code=args[3],
+        )
+        assert out.read_bytes() == expected.encode("utf-8")
+        assert render_full_html(*args, toc_script="<script>toc</script>") == expected
+
     def test_no_toc_flag(self, tmp_path):
         md_content = "# テスト企業（1234）\n\n## セクション1\n\nテスト\n"
         (tmp_path / "report.md").write_text(md_content, encoding="utf-8")
@@ -304,38 +428,47 @@ class TestBuildReport:
 
 class TestBuildToc:
     def test_h2_h3_extraction(self):
-        html = (
-            '<h1 id="title">タイトル</h1>'
-            '<h2 id="sec1">セクション1</h2>'
-            '<h3 id="sub1">サブセクション1</h3>'
-            '<h2 id="sec2">セクション2</h2>'
-            '<h4 id="deep">深い見出し</h4>'
+        md = (
+            "# タイトル\n"
+            "## セクション1\n"
+            "### サブセクション1\n"
+            "## セクション2\n"
+            "#### 深い見出し\n"
         )
         from corporate_reports.build_report import build_toc
 
-        toc = build_toc(html)
+        _, tokens = render_markdown(md)
+        toc = build_toc(tokens)
         assert "toc-sidebar" in toc
-        assert 'href="#sec1"' in toc
-        assert 'href="#sub1"' in toc
-        assert 'href="#sec2"' in toc
+        assert 'href="#セクション1"' in toc
+        assert 'href="#サブセクション1"' in toc
+        assert 'href="#セクション2"' in toc
         # h1 と h4 は含まれない
-        assert 'href="#title"' not in toc
-        assert 'href="#deep"' not in toc
+        assert 'href="#タイトル"' not in toc
+        assert 'href="#深い見出し"' not in toc
 
     def test_nested_structure(self):
-        html = (
-            '<h2 id="a">A</h2><h3 id="a1">A1</h3><h3 id="a2">A2</h3><h2 id="b">B</h2>'
-        )
+        md = "## A\n### A1\n### A2\n## B\n"
         from corporate_reports.build_report import build_toc
 
-        toc = build_toc(html)
+        _, tokens = render_markdown(md)
+        toc = build_toc(tokens)
         assert 'class="toc-h2"' in toc
         assert 'class="toc-h3"' in toc
+        # h3 は直前の h2 グループ内に入る
+        assert toc.index('href="#a1"') < toc.index('href="#b"')
+
+    def test_escaped_text(self):
+        from corporate_reports.build_report import build_toc
+
+        _, tokens = render_markdown("## R&D 投資\n")
+        assert "R&amp;D 投資" in build_toc(tokens)
 
     def test_empty_body(self):
         from corporate_reports.build_report import build_toc
 
-        assert build_toc("<p>本文のみ</p>") == ""
+        _, tokens = render_markdown("本文のみ")
+        assert build_toc(tokens) == ""
 
 
 # ---------------------------------------------------------------------------
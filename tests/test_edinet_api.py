@@ -2,17 +2,25 @@
 EDINET API クライアントのユニットテスト
 """
 
+import io
 import os
-from unittest.mock import Mock, patch, mock_open
+from unittest.mock import MagicMock, Mock, patch, mock_open
 import pytest
+from requests.adapters import HTTPAdapter
 
 # テスト用に環境変数を設定
 os.environ["EDINET_API_KEY"] = "test_api_key_12345"
 
 from corporate_reports.edinet import (
+    BASE_URL,
+    DOWNLOAD_CHUNK_SIZE,
+    RATE_LIMIT_DELAY,
+    _SESSION,
     search_documents,
     download_document,
+    download_many,
     EdinetAPIError,
+    _RateLimiter,
     check_api_key,
 )
 
@@ -20,9 +28,9 @@ from corporate_reports.edinet import (
 class TestSearchDocuments:
     """search_documents 関数のテスト"""
 
-    @patch("corporate_reports.edinet.requests.get")
-    @patch("corporate_reports.edinet.time.sleep")
-    def test_search_success(self, mock_sleep, mock_get):
+    @patch("corporate_reports.edinet._SESSION.get")
+    @patch("corporate_reports.edinet._rate_limit")
+    def test_search_success(self, mock_rate_limit, mock_get):
         """正常系: 書類検索が成功"""
         # モックレスポンスを設定
         mock_response = Mock()
@@ -48,11 +56,11 @@ class TestSearchDocuments:
         assert len(results) == 1
         assert results[0]["docID"] == "S100XXXX"
         mock_get.assert_called_once()
-        mock_sleep.assert_called_once()
+        mock_rate_limit.assert_called_once()
 
-    @patch("corporate_reports.edinet.requests.get")
-    @patch("corporate_reports.edinet.time.sleep")
-    def test_search_with_sec_code_filter(self, mock_sleep, mock_get):
+    @patch("corporate_reports.edinet._SESSION.get")
+    @patch("corporate_reports.edinet._rate_limit")
+    def test_search_with_sec_code_filter(self, mock_rate_limit, mock_get):
         """証券コードでフィルタリング"""
         mock_response = Mock()
         mock_response.json.return_value = {
@@ -73,9 +81,9 @@ class TestSearchDocuments:
         assert len(results) == 2
         assert all(r["secCode"][:4] == "5819" for r in results)
 
-    @patch("corporate_reports.edinet.requests.get")
-    @patch("corporate_reports.edinet.time.sleep")
-    def test_search_with_ordinance_and_form_code(self, mock_sleep, mock_get):
+    @patch("corporate_reports.edinet._SESSION.get")
+    @patch("corporate_reports.edinet._rate_limit")
+    def test_search_with_ordinance_and_form_code(self, mock_rate_limit, mock_get):
         """府令コード・様式コードでフィルタリング"""
         mock_response = Mock()
         mock_response.json.return_value = {
@@ -105,8 +113,52 @@ class TestSearchDocuments:
         assert len(results) == 1
         assert results[0]["docID"] == "S100A"
 
-    @patch("corporate_reports.edinet.requests.get")
-    def test_search_api_error(self, mock_get):
+    @patch("corporate_reports.edinet._SESSION.get")
+    @patch("corporate_reports.edinet._rate_limit")
+    def test_search_with_all_filters(self, mock_rate_limit, mock_get):
+        """証券コード・府令コード・様式コードを同時に指定（secCode 欠損も除外）"""
+        mock_response = Mock()
+        mock_response.json.return_value = {
+            "metadata": {"status": "200"},
+            "results": [
+                {
+                    "docID": "S100A",
+                    "secCode": "58190",
+                    "ordinanceCode": "010",
+                    "formCode": "030000",
+                },
+                {
+                    "docID": "S100B",
+                    "secCode": "58190",
+                    "ordinanceCode": "010",
+                    "formCode": "043000",
+                },
+                {
+                    "docID": "S100C",
+                    "secCode": "99910",
+                    "ordinanceCode": "010",
+                    "formCode": "030000",
+                },
+                {
+                    "docID": "S100D",
+                    "secCode": None,
+                    "ordinanceCode": "010",
+                    "formCode": "030000",
+                },
+            ],
+        }
+        mock_response.raise_for_status = Mock()
+        mock_get.return_value = mock_response
+
+        results = search_documents(
+            date="2025-03-27", sec_code="5819", ordinance_code="010", form_code="030000"
+        )
+
+        assert [r["docID"] for r in results] == ["S100A"]
+
+    @patch("corporate_reports.edinet._SESSION.get")
+    @patch("corporate_reports.edinet._rate_limit")
+    def test_search_api_error(self, mock_rate_limit, mock_get):
         """API エラー時の挙動"""
         mock_response = Mock()
         mock_response.json.return_value = {
@@ -118,8 +170,9 @@ class TestSearchDocuments:
         with pytest.raises(EdinetAPIError):
             search_documents(date="2025-03-27")
 
-    @patch("corporate_reports.edinet.requests.get")
-    def test_search_network_error(self, mock_get):
+    @patch("corporate_reports.edinet._SESSION.get")
+    @patch("corporate_reports.edinet._rate_limit")
+    def test_search_network_error(self, mock_rate_limit, mock_get):
         """ネットワークエラー時の挙動"""
         from requests.exceptions import RequestException
 
@@ -132,15 +185,16 @@ class TestSearchDocuments:
 class TestDownloadDocument:
     """download_document 関数のテスト"""
 
-    @patch("corporate_reports.edinet.requests.get")
-    @patch("corporate_reports.edinet.time.sleep")
+    @patch("corporate_reports.edinet._SESSION.get")
+    @patch("corporate_reports.edinet._rate_limit")
     @patch("builtins.open", new_callable=mock_open)
     @patch("pathlib.Path.mkdir")
-    def test_download_success(self, mock_mkdir, mock_file, mock_sleep, mock_get):
+    def test_download_success(self, mock_mkdir, mock_file, mock_rate_limit, mock_get):
         """正常系: 書類ダウンロードが成功"""
         # モックレスポンスを設定
-        mock_response = Mock()
-        mock_response.iter_content = Mock(return_value=[b"chunk1", b"chunk2"])
+        mock_response = MagicMock()
+        mock_response.__enter__.return_value = mock_response
+        mock_response.raw = io.BytesIO(b"chunk1chunk2")
         mock_response.raise_for_status = Mock()
         mock_get.return_value = mock_response
 
@@ -152,11 +206,50 @@ class TestDownloadDocument:
         # 検証
         assert output_path == "test/output.zip"
         mock_get.assert_called_once()
-        mock_sleep.assert_called_once()
+        mock_rate_limit.assert_called_once()
         mock_file.assert_called_once()
+        mock_file().write.assert_called_once_with(b"chunk1chunk2")
+
+    @patch("corporate_reports.edinet._SESSION.get")
+    @patch("corporate_reports.edinet._rate_limit")
+    def test_download_large_payload_to_file(self, mock_rate_limit, mock_get, tmp_path):
+        """読み込み単位を超えるサイズでも欠けずに保存される"""
+        payload = bytes(range(256)) * (DOWNLOAD_CHUNK_SIZE * 2 // 256 + 7)
+        mock_response = MagicMock()
+        mock_response.__enter__.return_value = mock_response
+        mock_response.raw = io.BytesIO(payload)
+        mock_get.return_value = mock_response
 
-    @patch("corporate_reports.edinet.requests.get")
-    def test_download_network_error(self, mock_get):
+        output = tmp_path / "nested" / "output.zip"
+        download_document(doc_id="S100XXXX", doc_type="1", output_path=str(output))
+
+        assert output.read_bytes() == payload
+        assert mock_response.raw.decode_content is True
+
+    @patch("corporate_reports.edinet._SESSION.get")
+    @patch("corporate_reports.edinet._rate_limit")
+    def test_download_stream_error_removes_partial_file(
+        self, mock_rate_limit, mock_get, tmp_path
+    ):
+        """ストリーム途中の切断は EdinetAPIError になり、書きかけのファイルは残らない"""
+        from urllib3.exceptions import ProtocolError
+
+        raw = MagicMock()
+        raw.read.side_effect = [b"partial", ProtocolError("Connection broken")]
+        mock_response = MagicMock()
+        mock_response.__enter__.return_value = mock_response
+        mock_response.raw = raw
+        mock_get.return_value = mock_response
+
+        output = tmp_path / "output.zip"
+        with pytest.raises(EdinetAPIError):
+            download_document(doc_id="S100XXXX", doc_type="1", output_path=str(output))
+
+        assert not output.exists()
+
+    @patch("corporate_reports.edinet._SESSION.get")
+    @patch("corporate_reports.edinet._rate_limit")
+    def test_download_network_error(self, mock_rate_limit, mock_get):
         """ネットワークエラー時の挙動"""
         from requests.exceptions import RequestException
 
@@ -168,26 +261,123 @@ class TestDownloadDocument:
             )
 
 
+class TestSession:
+    """EDINET 用 Session の設定テスト"""
+
+    def test_https_adapter_retries_rate_limit(self):
+        """https アダプタに 429/5xx のリトライが設定されている"""
+        adapter = _SESSION.get_adapter(BASE_URL)
+        assert isinstance(adapter, HTTPAdapter)
+        assert adapter.max_retries.total == 3
+        assert 429 in adapter.max_retries.status_forcelist
+
+
+class TestRateLimiter:
+    """_RateLimiter のテスト"""
+
+    @patch("corporate_reports.edinet.time.sleep")
+    @patch("corporate_reports.edinet.time.monotonic")
+    def test_first_call_does_not_wait(self, mock_monotonic, mock_sleep):
+        """初回は待たない"""
+        mock_monotonic.return_value = 100.0
+        _RateLimiter(RATE_LIMIT_DELAY).acquire()
+        mock_sleep.assert_not_called()
+
+    @patch("corporate_reports.edinet.time.sleep")
+    @patch("corporate_reports.edinet.time.monotonic")
+    def test_no_wait_after_interval(self, mock_monotonic, mock_sleep):
+        """前回から十分時間が経っていれば待たない"""
+        limiter = _RateLimiter(RATE_LIMIT_DELAY)
+        mock_monotonic.return_value = 99.0
+        limiter.acquire()
+        mock_monotonic.return_value = 100.0
+        limiter.acquire()
+        mock_sleep.assert_not_called()
+
+    @patch("corporate_reports.edinet.time.sleep")
+    @patch("corporate_reports.edinet.time.monotonic")
+    def test_waits_remaining_interval(self, mock_monotonic, mock_sleep):
+        """直前にリクエストしていれば不足分だけ待つ"""
+        limiter = _RateLimiter(RATE_LIMIT_DELAY)
+        mock_monotonic.return_value = 99.9
+        limiter.acquire()
+        mock_monotonic.return_value = 100.0
+        limiter.acquire()
+        mock_sleep.assert_called_once()
+        assert mock_sleep.call_args[0][0] == pytest.approx(RATE_LIMIT_DELAY - 0.1)
+
+    @patch("corporate_reports.edinet.time.sleep")
+    @patch("corporate_reports.edinet.time.monotonic")
+    def test_concurrent_callers_are_spaced(self, mock_monotonic, mock_sleep):
+        """同時に呼ばれても送信枠は interval ずつずれる"""
+        limiter = _RateLimiter(RATE_LIMIT_DELAY)
+        mock_monotonic.return_value = 100.0
+        for _ in range(3):
+            limiter.acquire()
+        waits = [c[0][0] for c in mock_sleep.call_args_list]
+        assert waits == pytest.approx([RATE_LIMIT_DELAY, RATE_LIMIT_DELAY * 2])
+
+
+class TestDownloadMany:
+    """download_many 関数のテスト"""
+
+    @patch("corporate_reports.edinet.download_document")
+    def test_returns_paths_in_task_order(self, mock_download):
+        """結果は tasks と同じ順序で返る"""
+        mock_download.side_effect = lambda doc_id, doc_type, path: path
+        tasks = [(f"S100000{i}", "5", f"/tmp/doc{i}.zip") for i in range(5)]
+
+        result = download_many(tasks)
+
+        assert result == [path for _, _, path in tasks]
+        assert mock_download.call_count == 5
+
+    @patch("corporate_reports.edinet.download_document")
+    def test_error_propagates(self, mock_download):
+        """ダウンロード失敗は呼び出し元に伝播する"""
+        mock_download.side_effect = EdinetAPIError("Download failed")
+        with pytest.raises(EdinetAPIError):
+            download_many([("S1000001", "5", "/tmp/doc.zip")])
+
+
 class TestCheckApiKey:
     """check_api_key 関数のテスト"""
 
+    def setup_method(self):
+        check_api_key.cache_clear()
+
+    def teardown_method(self):
+        check_api_key.cache_clear()
+
     def test_api_key_exists(self):
         """APIキーが設定されている場合"""
         # 環境変数は setUp で設定済みなので、例外が発生しないことを確認
         check_api_key()  # 例外が出なければOK
 
+    @patch("corporate_reports.edinet._load_env")
     @patch("corporate_reports.edinet.API_KEY", None)
     @patch.dict(os.environ, {}, clear=True)
-    def test_api_key_missing(self):
+    def test_api_key_missing(self, mock_load_env):
         """APIキーが未設定の場合"""
         with pytest.raises(SystemExit):
             check_api_key()
+        # 実在する .env から読み直さないよう _load_env は差し替えている
+        mock_load_env.assert_called_once()
+
+    def test_api_key_cached(self):
+        """2回目以降は環境変数を読み直さない"""
+        with patch(
+            "corporate_reports.edinet._get_api_key", return_value="cached_key"
+        ) as mock_get:
+            assert check_api_key() == "cached_key"
+            assert check_api_key() == "cached_key"
+        mock_get.assert_called_once()
 
 
 class TestMainCLI:
     """main() 関数（CLI）のテスト"""
 
-    @patch("corporate_reports.cli.search_documents")
+    @patch("corporate_reports.edinet.search_documents")
     @patch(
         "sys.argv",
         ["corporate-reports", "edinet", "search", "--date", "2025-03-27"],
@@ -207,7 +397,7 @@ class TestMainCLI:
             form_code=None,
         )
 
-    @patch("corporate_reports.cli.download_document")
+    @patch("corporate_reports.edinet.download_document")
     @patch(
         "sys.argv",
         [
@@ -233,7 +423,7 @@ class TestMainCLI:
             doc_id="S100XXXX", doc_type="2", output_path="test.zip"
         )
 
-    @patch("corporate_reports.cli.search_documents")
+    @patch("corporate_reports.edinet.search_documents")
     @patch(
         "sys.argv",
         ["corporate-reports", "edinet", "search", "--date", "2025-03-27"],
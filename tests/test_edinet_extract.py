@@ -289,13 +289,14 @@ SAMPLE_ROWS = [
 def _write_sample_csv(
     dirpath: Path,
     filename: str = "jpcrp030000-asr-001_E01350-000_2024-12-31_01_2025-03-21.csv",
+    rows: list[list[str]] = SAMPLE_ROWS,
 ):
     """サンプルCSVをUTF-16LE TSVとして書き出す（EDINET実ファイルと同じ形式）"""
     csv_path = dirpath / filename
     with open(csv_path, "w", encoding="utf-16le", newline="") as f:
         writer = csv.writer(f, delimiter="\t", quoting=csv.QUOTE_ALL)
         writer.writerow(SAMPLE_HEADER)
-        for row in SAMPLE_ROWS:
+        for row in rows:
             writer.writerow(row)
     return csv_path
 
@@ -329,6 +330,41 @@ class TestParseEdinetCSV:
         assert rows[0]["要素ID"] == "jpcrp_cor:NetSalesSummaryOfBusinessResults"
         assert rows[0]["値"] == "9697800000"
 
+    def test_parse_bom_before_quote(self, tmp_path):
+        """ファイル先頭の BOM の後にクォート付きヘッダーが続く形式"""
+        csv_path = tmp_path / "bom.csv"
+        content = '\ufeff"要素ID"\t"コンテキストID"\t"値"\r\n"a"\t"CurrentYearDuration"\t"1"\r\n'
+        csv_path.write_bytes(content.encode("utf-16le"))
+        rows = _parse_edinet_csv(csv_path)
+        assert rows == [
+            {"要素ID": "a", "コンテキストID": "CurrentYearDuration", "値": "1"}
+        ]
+
+    def test_parse_strips_only_cell_edges(self, tmp_path):
+        """セル前後の空白・クォートは除去し、値の途中のクォートは残す"""
+        csv_path = tmp_path / "quoted.csv"
+        content = '要素ID\t値\r\n a \t"""x"" ""y"""\r\n'
+        csv_path.write_bytes(content.encode("utf-16le"))
+        rows = _parse_edinet_csv(csv_path)
+        assert rows == [{"要素ID": "a", "値": 'x" "y'}]
+
+    def test_parse_selected_columns(self, tmp_path):
+        """columns 指定時は指定列のみ返す"""
+        csv_path = _write_sample_csv(tmp_path)
+        rows = _parse_edinet_csv(csv_path, columns=["要素ID", "値"])
+        assert len(rows) == len(SAMPLE_ROWS)
+        assert rows[0] == {
+            "要素ID": "jpcrp_cor:NetSalesSummaryOfBusinessResults",
+            "値": "9697800000",
+        }
+
+    def test_parse_filtered_elements(self, tmp_path):
+        """element_ids 指定時は該当要素の行のみ返す"""
+        csv_path = _write_sample_csv(tmp_path)
+        rows = _parse_edinet_csv(csv_path, element_ids={"jpcrp_cor:NumberOfEmployees"})
+        assert len(rows) == 1
+        assert rows[0]["値"] == "295"
+
 
 class TestExtractFinancialData:
     """extract_financial_data のテスト"""
@@ -385,6 +421,106 @@ class TestExtractFinancialData:
         assert current["1株配当"] == 55.00
         assert current["配当性向"] == 0.3603
 
+    def test_consolidation_mismatch_ignored(self, tmp_path):
+        """連結/個別のコンテキストが要素の種別と合わない行は無視される"""
+        extra_rows = [
+            # 連結の要素が個別コンテキストで出現
+            [
+                "jpcrp_cor:NetSalesSummaryOfBusinessResults",
+                "売上高、経営指標等",
+                "CurrentYearDuration_NonConsolidatedMember",
+                "当期",
+                "個別",
+                "期間",
+                "JPY",
+                "円",
+                "1",
+            ],
+            # 個別の要素が連結コンテキストで出現
+            [
+                "jpcrp_cor:DividendPaidPerShareSummaryOfBusinessResults",
+                "１株当たり配当額、経営指標等",
+                "Prior1YearDuration",
+                "前期",
+                "その他",
+                "期間",
+                "JPYPerShares",
+                "",
+                "99.00",
+            ],
+        ]
+        _write_sample_csv(tmp_path, rows=SAMPLE_ROWS + extra_rows)
+        summary = extract_financial_data(tmp_path)["経営指標等"]
+
+        assert summary["当期"]["売上高"] == 12383109000
+        assert "1株配当" not in summary["1期前"]
+
+    def test_first_occurrence_wins(self, tmp_path):
+        """同じ年度・項目が重複した場合は最初の値を採用する"""
+        duplicate = [
+            "jpcrp_cor:NetSalesSummaryOfBusinessResults",
+            "売上高、経営指標等",
+            "CurrentYearDuration",
+            "当期",
+            "その他",
+            "期間",
+            "JPY",
+            "円",
+            "1",
+        ]
+        _write_sample_csv(tmp_path, rows=SAMPLE_ROWS + [duplicate])
+        summary = extract_financial_data(tmp_path)["経営指標等"]
+
+        assert summary["当期"]["売上高"] == 12383109000
+
+    def test_segment_context_ignored(self, tmp_path):
+        """セグメント別など次元付きコンテキストの行は採用しない"""
+        segment = [
+            "jpcrp_cor:NumberOfEmployees",
+            "従業員数",
+            "CurrentYearInstant_ReportableSegmentsMember",
+            "当期末",
+            "その他",
+            "時点",
+            "pure",
+            "人",
+            "120",
+        ]
+        _write_sample_csv(tmp_path, rows=[segment] + SAMPLE_ROWS + [segment])
+        summary = extract_financial_data(tmp_path)["経営指標等"]
+
+        assert summary["当期"]["従業員数"] == 295
+
+    def test_stops_reading_when_all_cells_filled(self, tmp_path):
+        """全項目・全年度が揃ったら残りの行はデコードもしない"""
+        from corporate_reports.edinet import _CONTEXT_YEAR_MAP, _ELEMENT_LOOKUP
+
+        full_rows = [
+            [
+                eid,
+                key,
+                f"{prefix}Duration" + ("_NonConsolidatedMember" if nc else ""),
+                "",
+                "",
+                "",
+                "",
+                "",
+                "1",
+            ]
+            for eid, (key, nc) in _ELEMENT_LOOKUP.items()
+            for prefix in _CONTEXT_YEAR_MAP
+        ]
+        filler = [["jpcrp_cor:Other", "", "CurrentYearDuration"] + [""] * 6] * 20000
+        csv_path = _write_sample_csv(tmp_path, rows=full_rows + filler)
+        # 末尾に UTF-16 として不正なバイト列（対になっていないサロゲート）を置く
+        with open(csv_path, "ab") as f:
+            f.write(b"\x00\xd8A\x00")
+
+        summary = extract_financial_data(tmp_path)["経営指標等"]
+        assert all(len(values) == len(_ELEMENT_LOOKUP) for values in summary.values())
+        with pytest.raises(UnicodeDecodeError):
+            _parse_edinet_csv(csv_path)
+
     def test_csv_not_found(self, tmp_path):
         """CSVが見つからない場合のエラー"""
         with pytest.raises(EdinetAPIError, match="jpcrp030000-asr"):
@@ -398,10 +534,75 @@ class TestExtractFinancialData:
         assert "jpcrp030000-asr" in result["source"]
 
 
+class TestExtractCache:
+    """抽出結果キャッシュのテスト"""
+
+    def test_cache_written_and_reused(self, tmp_path):
+        """2回目はCSVを解析せずキャッシュから返す"""
+        _write_sample_csv(tmp_path)
+        first = extract_financial_data(tmp_path, use_cache=True)
+        assert len(list(tmp_path.glob("*.extracted.json"))) == 1
+
+        with patch("corporate_reports.edinet._iter_edinet_csv") as mock_parse:
+            second = extract_financial_data(tmp_path, use_cache=True)
+        mock_parse.assert_not_called()
+        assert second == first
+
+    def test_cache_invalidated_on_csv_change(self, tmp_path):
+        """CSVの内容が変わればキャッシュは使われない"""
+        _write_sample_csv(tmp_path)
+        extract_financial_data(tmp_path, use_cache=True)
+
+        _write_sample_csv(tmp_path, rows=SAMPLE_ROWS[:1])
+        result = extract_financial_data(tmp_path, use_cache=True)
+        assert "売上高" not in result["経営指標等"]["当期"]
+        assert result["経営指標等"]["4期前"]["売上高"] == 9697800000
+        # 古いキャッシュは置き換えられる
+        assert len(list(tmp_path.glob("*.extracted.json"))) == 1
+
+    def test_cache_invalidated_on_definition_change(self, tmp_path):
+        """抽出対象の要素が変われば、CSVが同じでもキャッシュは使われない"""
+        _write_sample_csv(tmp_path)
+        extract_financial_data(tmp_path, use_cache=True)
+
+        with patch.dict(
+            "corporate_reports.edinet._ELEMENT_LOOKUP",
+            {"jpcrp_cor:NumberOfEmployees": ("従業員", False)},
+        ):
+            result = extract_financial_data(tmp_path, use_cache=True)
+        assert result["経営指標等"]["当期"]["従業員"] == 295
+
+    def test_csv_read_once_on_cache_miss(self, tmp_path):
+        """キャッシュが無い場合もCSVの読み込みはハッシュ計算と抽出で1回"""
+        csv_path = _write_sample_csv(tmp_path)
+        with patch.object(
+            Path, "read_bytes", autospec=True, side_effect=Path.read_bytes
+        ) as mock_read:
+            extract_financial_data(tmp_path, use_cache=True)
+        csv_reads = [c for c in mock_read.call_args_list if c.args[0] == csv_path]
+        assert len(csv_reads) == 1
+
+    def test_corrupt_cache_ignored(self, tmp_path):
+        """壊れたキャッシュは無視して再抽出する"""
+        _write_sample_csv(tmp_path)
+        extract_financial_data(tmp_path, use_cache=True)
+        cache = next(tmp_path.glob("*.extracted.json"))
+        cache.write_text("{broken", encoding="utf-8")
+
+        result = extract_financial_data(tmp_path, use_cache=True)
+        assert result["経営指標等"]["当期"]["売上高"] == 12383109000
+
+    def test_cache_off_by_default(self, tmp_path):
+        """既定ではデータディレクトリにキャッシュを作らない"""
+        _write_sample_csv(tmp_path)
+        extract_financial_data(tmp_path)
+        assert list(tmp_path.glob("*.extracted.json")) == []
+
+
 class TestExtractCLI:
     """edinet extract CLI コマンドのテスト"""
 
-    @patch("corporate_reports.cli.extract_financial_data")
+    @patch("corporate_reports.edinet.extract_financial_data")
     @patch(
         "sys.argv",
         [
@@ -422,13 +623,13 @@ class TestExtractCLI:
         }
 
         main()
-        mock_extract.assert_called_once_with(csv_dir="/tmp/test_csv")
+        mock_extract.assert_called_once_with(csv_dir="/tmp/test_csv", use_cache=False)
 
         captured = capsys.readouterr()
         data = json.loads(captured.out)
         assert data["経営指標等"]["当期"]["売上高"] == 12383109000
 
-    @patch("corporate_reports.cli.extract_financial_data")
+    @patch("corporate_reports.edinet.extract_financial_data")
     def test_cli_extract_to_file(self, mock_extract, tmp_path):
         """extract コマンドで --output にファイル保存"""
         from corporate_reports.cli import main
@@ -457,3 +658,24 @@ class TestExtractCLI:
         assert output_file.exists()
         data = json.loads(output_file.read_text(encoding="utf-8"))
         assert data["経営指標等"]["当期"]["売上高"] == 100
+
+    @patch("corporate_reports.edinet.extract_financial_data")
+    @patch(
+        "sys.argv",
+        [
+            "corporate-reports",
+            "edinet",
+            "extract",
+            "--csv-dir",
+            "/tmp/test_csv",
+            "--cache",
+        ],
+    )
+    def test_cli_extract_cache_flag(self, mock_extract, capsys):
+        """--cache で抽出結果キャッシュを有効にする"""
+        from corporate_reports.cli import main
+
+        mock_extract.return_value = {"source": "/tmp/test.csv", "経営指標等": {}}
+
+        main()
+        mock_extract.assert_called_once_with(csv_dir="/tmp/test_csv", use_cache=True)
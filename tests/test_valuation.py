@@ -5,6 +5,8 @@
 """
 
 import json
+import os
+from pathlib import Path
 
 import pytest
 
@@ -12,6 +14,8 @@ from corporate_reports.valuation import (
     ValuationError,
     ValuationInput,
     _calc_dcf_scenario,
+    _calc_dcf_scenarios,
+    _normalize_millions,
     calc_dividend_yield,
     calc_ev_ebitda,
     calc_invested_capital,
@@ -78,18 +82,59 @@ CANARE_INPUT = {
 }
 
 
+# --- 計算結果のゴールデンファイル ---
+GOLDEN_DIR = Path(__file__).parent / "golden"
+
+
+# --- load_input 用のファイル内容（モジュール読み込み時に1回だけ生成） ---
+JECOS_INPUT_JSON = json.dumps(JECOS_INPUT).encode("utf-8")
+INVALID_JSON = b"not json"
+INVALID_UTF8_JSON = b'{"stock_price": "\xff"}'
+
+
+# --- 共有フィクスチャ（ValuationInput は frozen なのでセッション内で使い回せる） ---
+
+
+@pytest.fixture(scope="session")
+def jecos_input() -> ValuationInput:
+    return ValuationInput.from_dict(JECOS_INPUT)
+
+
+@pytest.fixture(scope="session")
+def canare_input() -> ValuationInput:
+    return ValuationInput.from_dict(CANARE_INPUT)
+
+
+@pytest.fixture(scope="session")
+def jecos_json_file(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """ジェコス入力のJSONファイル（読み込み専用で共有）"""
+    path = tmp_path_factory.mktemp("valuation") / "input.json"
+    path.write_bytes(JECOS_INPUT_JSON)
+    return path
+
+
+@pytest.fixture(scope="session")
+def jecos_result(jecos_input: ValuationInput) -> dict:
+    return calculate_valuation(jecos_input)
+
+
+@pytest.fixture(scope="session")
+def canare_result(canare_input: ValuationInput) -> dict:
+    return calculate_valuation(canare_input)
+
+
 class TestValuationInput:
     """ValuationInput のテスト"""
 
-    def test_from_dict_thousands(self):
+    def test_from_dict_thousands(self, jecos_input):
         """千株単位の変換"""
-        inp = ValuationInput.from_dict(JECOS_INPUT)
+        inp = jecos_input
         assert inp.shares == 33794 * 1000
         assert inp.stock_price == 1668
 
-    def test_from_dict_ex_treasury_priority(self):
+    def test_from_dict_ex_treasury_priority(self, canare_input):
         """shares_outstanding_ex_treasury が優先される"""
-        inp = ValuationInput.from_dict(CANARE_INPUT)
+        inp = canare_input
         assert inp.shares == 6841 * 1000
 
     def test_from_dict_shares_minus_treasury(self):
@@ -119,25 +164,43 @@ class TestValuationInput:
         inp = ValuationInput.from_dict(data)
         assert inp.net_cash == 5486.0
 
+    @pytest.mark.parametrize(
+        ("value", "expected"),
+        [
+            (1_000_000, 1_000_000),  # 境界値はそのまま
+            (1_000_001, 1000.001),
+            (-5_486_000, -5486.0),  # 負の値も絶対値で判定
+        ],
+    )
+    def test_normalize_millions(self, value, expected):
+        assert _normalize_millions(value) == expected
+
     def test_frozen(self):
         """frozenなので変更不可"""
         inp = ValuationInput.from_dict(JECOS_INPUT)
         with pytest.raises(AttributeError):
             inp.stock_price = 2000  # type: ignore[read-only-property]
 
+    def test_slots(self, jecos_input):
+        """slots 化されておりインスタンス辞書を持たない"""
+        assert not hasattr(jecos_input, "__dict__")
+
 
 class TestMarketCap:
     """時価総額の計算"""
 
-    def test_jecos(self):
-        """ジェコス: 1668 × 33,794,000 / 1,000,000 = 56,368.39"""
-        mcap = calc_market_cap(1668, 33794000)
-        assert mcap == pytest.approx(56368.39, rel=1e-4)
-
-    def test_canare(self):
-        """カナレ: 2527 × 6,841,000 / 1,000,000 = 17,287.21"""
-        mcap = calc_market_cap(2527, 6841000)
-        assert mcap == pytest.approx(17287.21, rel=1e-3)
+    @pytest.mark.parametrize(
+        ("price", "shares", "expected", "rel"),
+        [
+            # ジェコス: 1668 × 33,794,000 / 1,000,000 = 56,368.39
+            pytest.param(1668, 33794000, 56368.39, 1e-4, id="jecos"),
+            # カナレ: 2527 × 6,841,000 / 1,000,000 = 17,287.21
+            pytest.param(2527, 6841000, 17287.21, 1e-3, id="canare"),
+        ],
+    )
+    def test_company(self, price, shares, expected, rel):
+        mcap = calc_market_cap(price, shares)
+        assert mcap == pytest.approx(expected, rel=rel)
 
 
 class TestPER:
@@ -161,15 +224,18 @@ class TestPER:
 class TestPBR:
     """PBRの計算（簿価BPSで計算）"""
 
-    def test_jecos(self):
-        """ジェコス: 1668 / 1861.66 = 0.896"""
-        pbr = calc_pbr(1668, 1861.66)
-        assert pbr == pytest.approx(0.896, rel=1e-2)
-
-    def test_canare(self):
-        """カナレ: 2527 / 2635.79 = 0.959"""
-        pbr = calc_pbr(2527, 2635.79)
-        assert pbr == pytest.approx(0.959, rel=1e-2)
+    @pytest.mark.parametrize(
+        ("price", "bps", "expected"),
+        [
+            # ジェコス: 1668 / 1861.66 = 0.896
+            pytest.param(1668, 1861.66, 0.896, id="jecos"),
+            # カナレ: 2527 / 2635.79 = 0.959
+            pytest.param(2527, 2635.79, 0.959, id="canare"),
+        ],
+    )
+    def test_company(self, price, bps, expected):
+        pbr = calc_pbr(price, bps)
+        assert pbr == pytest.approx(expected, rel=1e-2)
 
     def test_bps_zero_raises(self):
         with pytest.raises(ValuationError, match="BPS"):
@@ -210,9 +276,9 @@ class TestROIC:
     def test_jecos(self):
         """ジェコス: NOPAT=7800*0.7=5460, IC=62918-5486=57432, ROIC=9.51%"""
         nopat = calc_nopat(7800, 0.30)
-        assert nopat == pytest.approx(5460, rel=1e-4)
+        assert nopat == 5460
         ic = calc_invested_capital(62918, 5486)
-        assert ic == pytest.approx(57432, rel=1e-4)
+        assert ic == 57432
         roic = calc_roic(nopat, ic)
         assert roic == pytest.approx(0.0951, rel=1e-2)
 
@@ -226,15 +292,18 @@ class TestROIC:
 class TestLiquidationDiscount:
     """清算価値ディスカウントの計算"""
 
-    def test_jecos(self):
-        """ジェコス: (1035 - 1668) / 1035 = -0.6116（プレミアム）"""
-        ld = calc_liquidation_discount(1035, 1668)
-        assert ld == pytest.approx(-0.6116, rel=1e-2)
-
-    def test_canare(self):
-        """カナレ: (3200 - 2527) / 3200 = 0.2103（ディスカウント）"""
-        ld = calc_liquidation_discount(3200, 2527)
-        assert ld == pytest.approx(0.2103, rel=1e-2)
+    @pytest.mark.parametrize(
+        ("liquidation_value", "price", "expected"),
+        [
+            # ジェコス: (1035 - 1668) / 1035 = -0.6116（プレミアム）
+            pytest.param(1035, 1668, -0.6116, id="jecos"),
+            # カナレ: (3200 - 2527) / 3200 = 0.2103（ディスカウント）
+            pytest.param(3200, 2527, 0.2103, id="canare"),
+        ],
+    )
+    def test_company(self, liquidation_value, price, expected):
+        ld = calc_liquidation_discount(liquidation_value, price)
+        assert ld == pytest.approx(expected, rel=1e-2)
 
     def test_none_value(self):
         assert calc_liquidation_discount(None, 1668) is None
@@ -243,39 +312,31 @@ class TestLiquidationDiscount:
 class TestDCFScenario:
     """DCFシナリオの計算"""
 
-    def test_jecos_bear(self):
-        """ジェコス弱気: TV = 5800/0.10 = 58000, EV = 58000+5486 = 63486百万円
-        1株 = 63486*1000000/33794000 = 1878.6円"""
+    @pytest.mark.parametrize(
+        ("fcf", "net_cash", "shares", "price", "tv", "ev", "per_share"),
+        [
+            # ジェコス弱気: TV = 5800/0.10 = 58000, EV = 58000+5486 = 63486百万円
+            # 1株 = 63486*1000000/33794000 = 1878.6円
+            pytest.param(5800, 5486, 33794000, 1668, 58000, 63486, 1879, id="jecos"),
+            # カナレ弱気: TV = 1666/0.10 = 16660, EV = 16660+13692 = 30352百万円
+            # 1株 = 30352*1000000/6841000 = 4436円
+            pytest.param(1666, 13692, 6841000, 2527, 16660, 30352, 4436, id="canare"),
+        ],
+    )
+    def test_bear(self, fcf, net_cash, shares, price, tv, ev, per_share):
         result = _calc_dcf_scenario(
-            fcf=5800,
+            fcf=fcf,
             growth_rate=0,
             discount_rate=0.10,
             years=5,
-            net_cash=5486,
-            shares=33794000,
-            price=1668,
+            net_cash=net_cash,
+            shares=shares,
+            price=price,
             label="弱気",
         )
-        assert result.terminal_value == pytest.approx(58000, rel=1e-4)
-        assert result.equity_value == pytest.approx(63486, rel=1e-4)
-        assert result.per_share == pytest.approx(1879, abs=2)
-
-    def test_canare_bear(self):
-        """カナレ弱気: TV = 1666/0.10 = 16660, EV = 16660+13692 = 30352百万円
-        1株 = 30352*1000000/6841000 = 4436円"""
-        result = _calc_dcf_scenario(
-            fcf=1666,
-            growth_rate=0,
-            discount_rate=0.10,
-            years=5,
-            net_cash=13692,
-            shares=6841000,
-            price=2527,
-            label="弱気",
-        )
-        assert result.terminal_value == pytest.approx(16660, rel=1e-4)
-        assert result.equity_value == pytest.approx(30352, rel=1e-4)
-        assert result.per_share == pytest.approx(4436, abs=2)
+        assert result.terminal_value == pytest.approx(tv, rel=1e-4)
+        assert result.equity_value == pytest.approx(ev, rel=1e-4)
+        assert result.per_share == pytest.approx(per_share, abs=2)
 
     def test_growth_scenario(self):
         """成長シナリオでは弱気より高い値になる"""
@@ -312,6 +373,56 @@ class TestDCFScenario:
         assert middle.per_share > bear.per_share
         assert strong.per_share > middle.per_share
 
+    @pytest.mark.parametrize("growth_rate", [0.05, 0.10, 0.20])
+    def test_growth_matches_yearly_sum(self, growth_rate):
+        """閉じた式の結果が年ごとの割引現在価値の合計と一致する（g == r を含む）"""
+        fcf, r, years, net_cash = 5800, 0.10, 5, 5486
+        pv_fcfs = sum(
+            fcf * (1 + growth_rate) ** t / (1 + r) ** t for t in range(1, years + 1)
+        )
+        terminal_value = fcf * (1 + growth_rate) ** years / r
+        expected_equity = pv_fcfs + terminal_value / (1 + r) ** years + net_cash
+
+        result = _calc_dcf_scenario(
+            fcf=fcf,
+            growth_rate=growth_rate,
+            discount_rate=r,
+            years=years,
+            net_cash=net_cash,
+            shares=33794000,
+            price=1668,
+            label="test",
+        )
+        assert result.terminal_value == pytest.approx(terminal_value, rel=1e-12)
+        assert result.equity_value == pytest.approx(expected_equity, rel=1e-12)
+
+    def test_scenarios_match_single_calls(self):
+        """まとめて計算した結果が1シナリオずつの計算と一致し、順序も保たれる"""
+        scenarios = [("弱気", 0), ("ミドル", 0.10), ("強気", 0.20)]
+        results = _calc_dcf_scenarios(
+            fcf=5800,
+            scenarios=scenarios,
+            discount_rate=0.10,
+            years=5,
+            net_cash=5486,
+            shares=33794000,
+            price=1668,
+        )
+
+        assert results == [
+            _calc_dcf_scenario(
+                fcf=5800,
+                growth_rate=g,
+                discount_rate=0.10,
+                years=5,
+                net_cash=5486,
+                shares=33794000,
+                price=1668,
+                label=label,
+            )
+            for label, g in scenarios
+        ]
+
     def test_discount_rate_zero_raises(self):
         with pytest.raises(ValuationError, match="割引率"):
             _calc_dcf_scenario(
@@ -329,37 +440,57 @@ class TestDCFScenario:
 class TestCalculateValuation:
     """統合関数のテスト"""
 
-    def test_jecos_full(self):
-        """ジェコスの全指標が計算される"""
-        inp = ValuationInput.from_dict(JECOS_INPUT)
-        result = calculate_valuation(inp)
-
-        assert result["stock_price"] == 1668
-        assert result["market_cap"] == pytest.approx(56368.39, rel=1e-3)
-        assert result["per_actual"] == pytest.approx(12.37, rel=1e-2)
-        assert result["per_forecast"] == pytest.approx(10.23, rel=1e-2)
-        assert result["pbr"] == pytest.approx(0.90, rel=1e-1)
-        assert result["dividend_yield"] == pytest.approx(0.0390, rel=1e-2)
-
-        # DCF 3シナリオが存在する
-        assert len(result["dcf"]) == 3
-        assert result["dcf"][0]["label"] == "弱気"
-        assert result["dcf"][1]["label"] == "ミドル"
-        assert result["dcf"][2]["label"] == "強気"
-
-    def test_canare_full(self):
-        """カナレの全指標が計算される"""
-        inp = ValuationInput.from_dict(CANARE_INPUT)
-        result = calculate_valuation(inp)
-
-        assert result["stock_price"] == 2527
-        assert result["pbr"] == pytest.approx(0.959, rel=1e-2)
-        assert result["dcf"][0]["per_share"] == pytest.approx(4436, abs=2)
-
-    def test_per_x_pbr(self):
+    @pytest.mark.parametrize(
+        ("key", "expected"),
+        [
+            ("stock_price", 1668),
+            ("market_cap", pytest.approx(56368.39, rel=1e-3)),
+            ("per_actual", pytest.approx(12.37, rel=1e-2)),
+            ("per_forecast", pytest.approx(10.23, rel=1e-2)),
+            ("pbr", pytest.approx(0.90, rel=1e-1)),
+            ("dividend_yield", pytest.approx(0.0390, rel=1e-2)),
+        ],
+    )
+    def test_jecos_metrics(self, jecos_result, key, expected):
+        """ジェコスの各指標が計算される"""
+        assert jecos_result[key] == expected
+
+    def test_jecos_dcf_scenarios(self, jecos_result):
+        """DCF 3シナリオが存在する"""
+        labels = [d["label"] for d in jecos_result["dcf"]]
+        assert labels == ["弱気", "ミドル", "強気"]
+
+    @pytest.mark.parametrize(
+        ("key", "expected"),
+        [
+            ("stock_price", 2527),
+            ("pbr", pytest.approx(0.959, rel=1e-2)),
+        ],
+    )
+    def test_canare_metrics(self, canare_result, key, expected):
+        """カナレの各指標が計算される"""
+        assert canare_result[key] == expected
+
+    def test_canare_dcf_bear(self, canare_result):
+        """カナレ弱気シナリオの1株価値"""
+        assert canare_result["dcf"][0]["per_share"] == pytest.approx(4436, abs=2)
+
+    @pytest.mark.parametrize("name", ["jecos", "canare"])
+    def test_matches_golden(self, name, request):
+        """計算結果全体が tests/golden/<name>.json と一致する
+
+        計算ロジックを意図して変えた場合は
+        UPDATE_GOLDEN=1 uv run pytest tests/test_valuation.py -k golden で再生成する。
+        """
+        result = request.getfixturevalue(f"{name}_result")
+        golden = GOLDEN_DIR / f"{name}.json"
+        if os.environ.get("UPDATE_GOLDEN"):
+            golden.write_text(format_output(result) + "\n", encoding="utf-8")
+        assert json.loads(golden.read_bytes()) == result
+
+    def test_per_x_pbr(self, jecos_result):
         """PER×PBRが計算される"""
-        inp = ValuationInput.from_dict(JECOS_INPUT)
-        result = calculate_valuation(inp)
+        result = jecos_result
         expected = result["per_forecast"] * result["pbr"]
         assert result["per_x_pbr"] == pytest.approx(expected, rel=1e-2)
 
@@ -376,19 +507,24 @@ class TestCalculateValuation:
 class TestLoadInput:
     """JSONファイル読み込みのテスト"""
 
-    def test_load_valid(self, tmp_path):
+    def test_load_valid(self, jecos_json_file):
         """正常なJSONファイルの読み込み"""
-        json_file = tmp_path / "input.json"
-        json_file.write_text(json.dumps(JECOS_INPUT), encoding="utf-8")
-
-        inp = load_input(json_file)
+        inp = load_input(jecos_json_file)
         assert inp.stock_price == 1668
         assert inp.shares == 33794000
 
     def test_load_invalid_json(self, tmp_path):
         """不正なJSONでエラー"""
         json_file = tmp_path / "bad.json"
-        json_file.write_text("not json", encoding="utf-8")
+        json_file.write_bytes(INVALID_JSON)
+
+        with pytest.raises(ValuationError, match="読み込み"):
+            load_input(json_file)
+
+    def test_load_invalid_encoding(self, tmp_path):
+        """UTF-8 として不正なバイト列でエラー"""
+        json_file = tmp_path / "bad.json"
+        json_file.write_bytes(INVALID_UTF8_JSON)
 
         with pytest.raises(ValuationError, match="読み込み"):
             load_input(json_file)
@@ -399,8 +535,8 @@ class TestLoadInput:
             load_input(tmp_path / "missing.json")
 
     def test_format_output(self):
-        """JSON出力フォーマット"""
-        result = {"stock_price": 1668, "per_actual": 12.37}
-        output = format_output(result)
-        parsed = json.loads(output)
-        assert parsed["stock_price"] == 1668
+        """JSON出力フォーマット（インデント2・日本語はエスケープしない）"""
+        result = {"stock_price": 1668, "per_actual": 12.37, "label": "弱気"}
+        assert format_output(result) == (
+            '{\n  "stock_price": 1668,\n  "per_actual": 12.37,\n  "label": "弱気"\n}'
+        )